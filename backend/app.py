@@ -1,8 +1,10 @@
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
 import os
+from zoneinfo import ZoneInfo
 
 # 載入環境變數
 load_dotenv()
@@ -14,14 +16,48 @@ def create_app():
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY')
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES', 3600))
+    # JWT 內角色宣告的有效秒數，超過後改查資料庫確認角色與帳號狀態
+    app.config['JWT_ROLE_CLAIMS_MAX_AGE'] = int(os.getenv('JWT_ROLE_CLAIMS_MAX_AGE', 300))
+    # Token 黑名單（登出、flask revoke-user-tokens）：各 worker 每隔 JWT_BLOCKLIST_REFRESH 秒同步一次，
+    # 0 表示每個請求查詢資料庫；停用時登出只由前端刪除 Token
+    app.config['JWT_BLOCKLIST_ENABLED'] = os.getenv('JWT_BLOCKLIST_ENABLED', 'true').lower() in ('true', '1')
+    app.config['JWT_BLOCKLIST_REFRESH'] = float(os.getenv('JWT_BLOCKLIST_REFRESH', 5))
+    # 學校所在時區，「今日 / 本週」等日期界線依此計算（資料庫中的時間為 UTC）
+    app.config['SCHOOL_TIMEZONE'] = ZoneInfo(os.getenv('SCHOOL_TIMEZONE', 'Asia/Taipei'))
+    
+    # 請求內容大小上限（bytes），超過時回傳 413；帳號匯入是最大的上傳
+    app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', 2 * 1024 * 1024))
     
     # MongoDB 設定
     app.config['MONGODB_URI'] = os.getenv('MONGODB_URI')
     app.config['MONGODB_DATABASE'] = os.getenv('MONGODB_DATABASE')
     
+    # 在反向代理（nginx）後方時，依 X-Forwarded-For 取得用戶端 IP（值為信任的代理層數）
+    proxy_count = int(os.getenv('PROXY_FIX_X_FOR', 0))
+    if proxy_count:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_count)
+    
+    # 請求指標（/metrics），需在回應壓縮之前註冊才會記錄壓縮後的大小
+    from utils.metrics import init_metrics
+    init_metrics(app)
+    
+    # 每個請求的資料庫指令次數與耗時（X-DB-Calls / Server-Timing 標頭）
+    from utils.db_monitoring import init_db_monitoring
+    init_db_monitoring(app)
+    
+    # JSON 序列化（原生支援 datetime / ObjectId）與回應壓縮
+    from utils.json_provider import create_json_provider
+    from utils.compression import init_compression
+    app.json = create_json_provider(app)
+    init_compression(app)
+    
     # 初始化擴充套件
     CORS(app)
-    JWTManager(app)
+    jwt = JWTManager(app)
+    
+    # 目前使用者載入（同一請求只查詢一次）
+    from utils.identity import init_identity
+    init_identity(jwt)
     
     # 註冊藍圖
     from routes.auth import auth_bp
@@ -32,10 +68,22 @@ def create_app():
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(leave_bp, url_prefix='/api/leave')
     
+    # 管理指令
+    from commands import init_commands
+    init_commands(app)
+    
+    # 啟動時建立缺少的索引（註冊等流程依賴唯一索引避免重複資料；索引定義見 config/indexes.py）
+    if os.getenv('ENSURE_INDEXES', 'true').lower() in ('true', '1'):
+        from config.indexes import ensure_indexes
+        for collection_name, keys in ensure_indexes():
+            app.logger.warning(f'已建立缺少的索引: {collection_name} {keys}')
+    
     return app
 
 if __name__ == '__main__':
+    # 開發伺服器；生產環境請使用 gunicorn -c gunicorn.conf.py wsgi:app
     app = create_app()
     port = int(os.getenv('PORT', 5000))
     host = os.getenv('HOST', '0.0.0.0')
-    app.run(host=host, port=port, debug=True)
+    debug = os.getenv('FLASK_DEBUG', 'False').lower() in ('true', '1')
+    app.run(host=host, port=port, debug=debug)
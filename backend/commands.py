@@ -0,0 +1,79 @@
+import click
+from flask import current_app
+from config.indexes import audit_indexes, drop_unregistered_indexes, ensure_indexes
+from models.leave_request import LeaveRequest
+from models.leave_summary import LeaveSummary
+from models.user import User
+from utils.identity import blocklist
+
+@click.command('rebuild-leave-summaries')
+@click.confirmation_option(prompt='重建期間的申請與審核不會計入彙總，請確認已停止服務或暫停申請與審核。是否繼續？')
+def rebuild_leave_summaries():
+    """由所有請假申請重新計算學生請假彙總 (leave_summaries)，僅限維護時段執行"""
+    count = LeaveSummary.rebuild()
+    click.echo(f'✅ 已重建 {count} 筆學生請假彙總')
+
+@click.command('backfill-reason-ngrams')
+def backfill_reason_ngrams():
+    """為既有的請假申請建立請假原因搜尋詞元 (reason_ngrams)"""
+    count = LeaveRequest.backfill_reason_ngrams()
+    click.echo(f'✅ 已更新 {count} 筆請假申請的搜尋詞元')
+
+@click.command('import-users')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--max-rows', default=1000000, show_default=True, help='匯入筆數上限')
+def import_users(csv_file, max_rows):
+    """由 CSV 檔案批次建立帳號（欄位同 POST /api/users/import）"""
+    created, errors = User.import_csv(csv_file, max_rows=max_rows)
+    for error in errors:
+        click.echo(f"❌ 第 {error['row']} 行 {error['email']}: {error['message']}")
+    click.echo(f'✅ 已建立 {created} 個帳號，失敗 {len(errors)} 筆')
+
+@click.command('revoke-user-tokens')
+@click.argument('email')
+def revoke_user_tokens(email):
+    """撤銷使用者目前所有的登入 Token（於資料庫變更角色或停用帳號後執行，所有 worker 立即生效）"""
+    user = User.find_by_email(email.lower().strip())
+    if not user:
+        raise click.ClickException(f'找不到使用者 {email}')
+    blocklist.revoke_user(user._id, current_app.config['JWT_ACCESS_TOKEN_EXPIRES'])
+    User.invalidate_cache(user._id)
+    click.echo(f'✅ 已撤銷 {email} 的所有登入 Token')
+
+@click.command('ensure-indexes')
+@click.option('--drop-unregistered', is_flag=True, help='同時刪除不在 config/indexes.py 登錄中的索引')
+def ensure_indexes_command(drop_unregistered):
+    """依 config/indexes.py 建立缺少的索引"""
+    for collection_name, keys in ensure_indexes():
+        click.echo(f'✅ 已建立 {collection_name} {keys}')
+    if drop_unregistered:
+        for collection_name, name in drop_unregistered_indexes():
+            click.echo(f'🗑️ 已刪除 {collection_name}.{name}')
+    click.echo('✅ 索引已與登錄一致')
+
+@click.command('audit-indexes')
+def audit_indexes_command():
+    """列出索引使用次數 ($indexStats)、未使用、前綴重複與未登錄的索引"""
+    warnings = 0
+    for entry in audit_indexes():
+        notes = []
+        if entry['unused']:
+            notes.append('未使用')
+        if entry['redundant_of']:
+            notes.append(f"為 {entry['redundant_of']} 的前綴")
+        if not entry['registered']:
+            notes.append('未登錄')
+        ops = '-' if entry['ops'] is None else entry['ops']
+        mark = '⚠️' if notes else '✅'
+        click.echo(f"{mark} {entry['collection']}.{entry['name']} 使用 {ops} 次 {'、'.join(notes)}".rstrip())
+        warnings += bool(notes)
+    click.echo(f'共 {warnings} 個索引需要檢查（使用次數自伺服器啟動或索引建立起計算）')
+
+def init_commands(app):
+    """註冊管理指令（flask --app app <指令>）"""
+    app.cli.add_command(rebuild_leave_summaries)
+    app.cli.add_command(backfill_reason_ngrams)
+    app.cli.add_command(import_users)
+    app.cli.add_command(revoke_user_tokens)
+    app.cli.add_command(ensure_indexes_command)
+    app.cli.add_command(audit_indexes_command)
@@ -1,27 +1,226 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
+from contextvars import ContextVar
+import json
+import logging
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# 超過此時間（毫秒）的資料庫指令記錄到慢查詢日誌；設為負數停用
+MONGODB_SLOW_QUERY_MS = float(os.getenv('MONGODB_SLOW_QUERY_MS', 100))
+# 慢查詢日誌中，陣列最多列出的元素數
+SHAPE_MAX_ITEMS = 3
+
+slow_query_logger = logging.getLogger('mongodb.slow_query')
+
+# 連線池與逾時設定：環境變數名稱 -> (MongoClient 參數, 型別)，未設定時使用 PyMongo 預設值
+CLIENT_OPTIONS = {
+    'MONGODB_MAX_POOL_SIZE': ('maxPoolSize', int),
+    'MONGODB_MIN_POOL_SIZE': ('minPoolSize', int),
+    'MONGODB_MAX_IDLE_TIME_MS': ('maxIdleTimeMS', int),
+    'MONGODB_WAIT_QUEUE_TIMEOUT_MS': ('waitQueueTimeoutMS', int),
+    'MONGODB_CONNECT_TIMEOUT_MS': ('connectTimeoutMS', int),
+    'MONGODB_SERVER_SELECTION_TIMEOUT_MS': ('serverSelectionTimeoutMS', int),
+    'MONGODB_SOCKET_TIMEOUT_MS': ('socketTimeoutMS', int),
+    'MONGODB_COMPRESSORS': ('compressors', str),  # 例如 zstd,snappy,zlib
+    'MONGODB_READ_PREFERENCE': ('readPreference', str),  # 例如 secondaryPreferred
+}
+
+def client_options():
+    """由環境變數組合 MongoClient 參數"""
+    options = {}
+    for env_name, (option, cast) in CLIENT_OPTIONS.items():
+        value = os.getenv(env_name)
+        if value:
+            options[option] = cast(value)
+    return options
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """統計連線池使用狀況，作為調整 maxPoolSize / minPoolSize 的依據"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.open_connections = 0
+            self.in_use = 0
+            self.max_in_use = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.checkout_wait_ms = 0.0
+            self.pool_clears = 0
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+    
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+    
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+    
+    def connection_checked_out(self, event):
+        waited = time.perf_counter() - getattr(self._local, 'started', time.perf_counter())
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_ms += waited * 1000
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+    
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'open_connections': self.open_connections,
+                'in_use': self.in_use,
+                'max_in_use': self.max_in_use,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'avg_checkout_wait_ms': self.checkout_wait_ms / self.checkouts if self.checkouts else 0.0,
+                'pool_clears': self.pool_clears
+            }
+
+class RequestCommandStats:
+    """單一請求的資料庫指令統計（請求 ID、端點、指令次數與總耗時）"""
+    __slots__ = ('request_id', 'endpoint', 'calls', 'duration_ms')
+    
+    def __init__(self, request_id, endpoint):
+        self.request_id = request_id
+        self.endpoint = endpoint
+        self.calls = 0
+        self.duration_ms = 0.0
+
+# 目前請求的指令統計，由 utils/db_monitoring.py 在每個請求開始時設定（請求以外為 None）
+current_command_stats = ContextVar('current_command_stats', default=None)
+
+def _redact(value):
+    """只保留查詢結構：欄位名稱與運算子保留，值以 ? 取代"""
+    if isinstance(value, dict):
+        return {key: _redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if not any(isinstance(item, (dict, list, tuple)) for item in value):
+            return f'[{len(value)} 個值]'
+        shape = [_redact(item) for item in value[:SHAPE_MAX_ITEMS]]
+        if len(value) > SHAPE_MAX_ITEMS:
+            shape.append(f'... 共 {len(value)} 筆')
+        return shape
+    return '?'
+
+# 指令中不含使用者資料、保留原值的欄位
+SHAPE_KEEP_KEYS = ('sort', 'projection', 'limit', 'skip', 'batchSize', 'hint', 'ordered')
+
+def command_shape(command_name, command):
+    """慢查詢日誌使用的指令結構（集合名稱與選項保留，查詢條件與文件內容遮蔽）"""
+    shape = {}
+    for key, value in command.items():
+        if key == command_name or key in SHAPE_KEEP_KEYS:
+            shape[key] = value
+        elif key == 'documents':
+            shape[key] = f'[{len(value)} 筆文件]'
+        elif key == 'lsid' or key == 'txnNumber' or key.startswith('$'):
+            continue
+        else:
+            shape[key] = _redact(value)
+    return shape
+
+class CommandStatsListener(monitoring.CommandListener):
+    """記錄每個資料庫指令的耗時：累計到目前請求的統計，並將慢查詢寫入日誌
+    
+    PyMongo 在發出指令的執行緒（或協程）中同步通知，因此可直接取得目前請求的統計
+    """
+    
+    def __init__(self, slow_ms=MONGODB_SLOW_QUERY_MS):
+        self.slow_ms = slow_ms
+        # 指令開始時保存指令內容（只保存參照），完成時若超過門檻才轉換為結構
+        self._commands = {}
+    
+    def started(self, event):
+        if self.slow_ms >= 0:
+            self._commands[event.request_id] = event.command
+    
+    def succeeded(self, event):
+        self._finished(event)
+    
+    def failed(self, event):
+        self._finished(event)
+    
+    def _finished(self, event):
+        command = self._commands.pop(event.request_id, None)
+        duration_ms = event.duration_micros / 1000
+        stats = current_command_stats.get()
+        if stats is not None:
+            stats.calls += 1
+            stats.duration_ms += duration_ms
+        
+        if command is not None and duration_ms >= self.slow_ms:
+            slow_query_logger.warning(
+                '慢查詢 %.1f ms %s endpoint=%s request_id=%s %s',
+                duration_ms, event.command_name,
+                stats.endpoint if stats else '-', stats.request_id if stats else '-',
+                json.dumps(command_shape(event.command_name, command), ensure_ascii=False, default=str)
+            )
+
 class Database:
     _instance = None
     _client = None
     _database = None
+    _pid = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(Database, cls).__new__(cls)
+            cls._instance.pool_stats = PoolStatsListener()
+            cls._instance.command_stats = CommandStatsListener()
         return cls._instance
     
     def connect(self):
+        # MongoClient 不可跨 fork 使用：在子行程（例如 gunicorn worker）中重新建立連線
+        if self._client is not None and self._pid != os.getpid():
+            self.reset()
+        
         if self._client is None:
             mongodb_uri = os.getenv('MONGODB_URI')
             database_name = os.getenv('MONGODB_DATABASE')
             
             try:
-                self._client = MongoClient(mongodb_uri)
+                self._client = MongoClient(
+                    mongodb_uri,
+                    event_listeners=self.event_listeners(),
+                    **client_options()
+                )
                 self._database = self._client[database_name]
+                self._pid = os.getpid()
                 # 測試連接
                 self._client.admin.command('ping')
                 print(f"Successfully connected to MongoDB: {database_name}")
@@ -29,8 +228,33 @@ class Database:
                 print(f"Failed to connect to MongoDB: {e}")
                 raise e
     
+    def event_listeners(self):
+        """連線池統計，以及指令監控（MONGODB_COMMAND_MONITORING=false 時停用）"""
+        listeners = [self.pool_stats]
+        if os.getenv('MONGODB_COMMAND_MONITORING', 'true').lower() in ('true', '1'):
+            listeners.append(self.command_stats)
+        return listeners
+    
+    def warm_up(self):
+        """啟動時預先建立連線，避免第一個請求承擔連線建立的延遲
+        
+        設定 MONGODB_MIN_POOL_SIZE 時，PyMongo 會在背景補足最少連線數
+        """
+        self.connect()
+        connections = int(os.getenv('MONGODB_WARM_UP_CONNECTIONS', 0))
+        if connections > 1:
+            # 同時發出多個 ping，讓連線池一次開好多條連線
+            threads = [
+                threading.Thread(target=self._client.admin.command, args=('ping',))
+                for _ in range(connections)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    
     def get_database(self):
-        if self._database is None:
+        if self._database is None or self._pid != os.getpid():
             self.connect()
         return self._database
     
@@ -38,6 +262,17 @@ class Database:
         db = self.get_database()
         return db[collection_name]
     
+    def get_pool_stats(self):
+        """取得目前行程的連線池統計"""
+        return self.pool_stats.stats()
+    
+    def reset(self):
+        """捨棄從父行程繼承的連線（不關閉，避免影響父行程的 socket）"""
+        self._client = None
+        self._database = None
+        self._pid = None
+        self.pool_stats.reset()
+    
     def close_connection(self):
         if self._client:
             self._client.close()
@@ -0,0 +1,149 @@
+from pymongo.errors import OperationFailure
+from config.database import db
+
+# 應用程式使用的索引 (集合, 索引欄位, 選項)，啟動時與 flask ensure-indexes 依此建立缺少的索引
+# 每個索引都會拖慢該集合的寫入，新增查詢時請同時確認索引，並以 flask audit-indexes 檢查
+INDEXES = [
+    # 登入 / 註冊：註冊直接寫入，以唯一索引判斷 Email 是否重複
+    ('users', [('email', 1)], {'unique': True}),
+    # 搜尋：依學號查找學生
+    ('users', [('student_id', 1)], {}),
+
+    # 我的請假記錄分頁 (user_id + created_at + _id)
+    ('leave_requests', [('user_id', 1), ('created_at', -1), ('_id', -1)], {}),
+    # 我的請假記錄依狀態篩選
+    ('leave_requests', [('user_id', 1), ('status', 1)], {}),
+    # 待審核清單分頁 (status + created_at + _id)
+    ('leave_requests', [('status', 1), ('created_at', 1), ('_id', 1)], {}),
+    # 搜尋：每種篩選條件搭配 (created_at, _id) 排序
+    ('leave_requests', [('reason_ngrams', 1), ('created_at', -1), ('_id', -1)], {}),
+    ('leave_requests', [('leave_type', 1), ('created_at', -1), ('_id', -1)], {}),
+    ('leave_requests', [('approved_by', 1), ('created_at', -1), ('_id', -1)], {}),
+    ('leave_requests', [('created_at', -1), ('_id', -1)], {}),
+    # 匯出依 (start_date, _id) 排序，由索引順序讀取不需在記憶體中排序；統計報表的日期範圍也使用此索引
+    # （status 只有三種值，放在索引中篩選的效益低於多維護一個索引的寫入成本）
+    ('leave_requests', [('start_date', 1), ('_id', 1)], {}),
+    # 今日 / 本週審核數
+    ('leave_requests', [('approved_at', 1)], {}),
+    # 申請日期重疊檢查：end_date 在前，範圍條件 end_date >= 新申請開始日期只會涵蓋近期與未來的申請
+    ('leave_requests', [('user_id', 1), ('end_date', 1), ('start_date', 1)], {}),
+
+    # 短時間互斥鎖（過期的鎖文件自動清除）
+    ('locks', [('expires_at', 1)], {'expireAfterSeconds': 0}),
+
+    # Token 黑名單（Token 過期後自動清除；各 worker 依 revoked_at 增量同步）
+    ('revoked_tokens', [('expires_at', 1)], {'expireAfterSeconds': 0}),
+    ('revoked_tokens', [('revoked_at', 1)], {}),
+
+    # 學生每學期請假彙總（一位學生一學期一份文件）
+    ('leave_summaries', [('user_id', 1), ('term', 1)], {'unique': True}),
+]
+
+# 影響索引行為的選項；這些索引不視為其他索引的前綴而可刪除
+SPECIAL_OPTIONS = ('unique', 'expireAfterSeconds', 'partialFilterExpression', 'sparse')
+
+def _keys(index):
+    # mongo shell 建立的索引方向為浮點數 (1.0)，與 1 比較結果相同
+    return [tuple(item) for item in index['key']]
+
+def _find_index(existing, keys):
+    return next((index for index in existing.values() if _keys(index) == keys), None)
+
+def _registered(collection_name):
+    """某集合登錄的索引欄位清單"""
+    return [keys for name, keys, _ in INDEXES if name == collection_name]
+
+def _collections():
+    return list(dict.fromkeys(name for name, _, _ in INDEXES))
+
+def _is_special(index):
+    return any(index.get(option) for option in SPECIAL_OPTIONS)
+
+def _covers(keys, other):
+    """other 的前綴與 keys 相同（或方向完全相反）時，keys 可由 other 取代"""
+    if len(keys) >= len(other):
+        return False
+    prefix = other[:len(keys)]
+    reversed_keys = [(field, -direction) if isinstance(direction, (int, float)) else (field, direction)
+                     for field, direction in keys]
+    return prefix == keys or prefix == reversed_keys
+
+def ensure_indexes():
+    """建立登錄中缺少的索引，回傳建立的索引清單 [(集合, 索引欄位)]
+
+    已有同欄位但選項不同的索引，或既有資料違反唯一性而無法建立時拋出 RuntimeError
+    """
+    created = []
+    existing_by_collection = {}
+    for collection_name, keys, options in INDEXES:
+        collection = db.get_collection(collection_name)
+        if collection_name not in existing_by_collection:
+            existing_by_collection[collection_name] = collection.index_information()
+        index = _find_index(existing_by_collection[collection_name], keys)
+        if index is not None and all(index.get(option) == value for option, value in options.items()):
+            continue
+        try:
+            collection.create_index(keys, **options)
+        except OperationFailure as e:
+            raise RuntimeError(f'無法建立 {collection_name} 的索引 {keys}: {e}') from e
+        created.append((collection_name, keys))
+    return created
+
+def drop_unregistered_indexes():
+    """刪除不在登錄中的索引（_id 除外），回傳刪除的索引清單 [(集合, 索引名稱)]"""
+    dropped = []
+    for collection_name in _collections():
+        collection = db.get_collection(collection_name)
+        registered = _registered(collection_name)
+        for name, index in collection.index_information().items():
+            if name == '_id_' or _keys(index) in registered:
+                continue
+            collection.drop_index(name)
+            dropped.append((collection_name, name))
+    return dropped
+
+def _index_usage(collection):
+    """$indexStats 的使用次數 {索引名稱: (次數, 起算時間)}；伺服器不支援時回傳空 dict"""
+    try:
+        return {
+            stats['name']: (stats['accesses']['ops'], stats['accesses']['since'])
+            for stats in collection.aggregate([{'$indexStats': {}}])
+        }
+    except OperationFailure:
+        return {}
+
+def audit_indexes():
+    """檢查登錄集合的索引，回傳每個索引的報告
+
+    unused：$indexStats 自伺服器啟動（或索引建立）以來沒有任何查詢使用；
+    redundant_of：欄位為另一個索引的前綴，查詢可改用該索引；
+    registered：是否在 INDEXES 中（未登錄的索引不會由 ensure_indexes 維護）
+    """
+    report = []
+    for collection_name in _collections():
+        collection = db.get_collection(collection_name)
+        existing = collection.index_information()
+        usage = _index_usage(collection)
+        registered = _registered(collection_name)
+        for name, index in existing.items():
+            keys = _keys(index)
+            ops, since = usage.get(name, (None, None))
+            redundant_of = None
+            if name != '_id_' and not _is_special(index):
+                redundant_of = next(
+                    (other_name for other_name, other in existing.items()
+                     if other_name != name and not other.get('partialFilterExpression') and not other.get('sparse')
+                     and _covers(keys, _keys(other))),
+                    None
+                )
+            report.append({
+                'collection': collection_name,
+                'name': name,
+                'key': keys,
+                'registered': name == '_id_' or keys in registered,
+                'ops': ops,
+                'since': since,
+                'unused': ops == 0 and name != '_id_',
+                'redundant_of': redundant_of,
+            })
+    return report
@@ -0,0 +1,100 @@
+"""
+Gunicorn 設定檔（生產環境）
+啟動方式: gunicorn -c gunicorn.conf.py wsgi:app
+所有參數皆可由環境變數調整
+"""
+
+import multiprocessing
+import os
+
+# 高併發模式：GUNICORN_WORKER_CLASS=gevent
+# 每個 worker 以協程處理大量同時連線，等待 MongoDB 回應時不佔用執行緒。
+# 必須在載入應用程式（preload_app）之前完成 monkey patch，讓鎖與 thread local 改為協程版本
+if os.getenv('GUNICORN_WORKER_CLASS') == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+# 與 app.py 相同讀取 .env（在 monkey patch 之後匯入），下方依環境變數決定的預設值（例如 USER_CACHE_TTL）
+# 才不會覆蓋 .env 中的設定；GUNICORN_WORKER_CLASS 需由環境變數提供
+from dotenv import load_dotenv  # noqa: E402
+load_dotenv()
+
+# 多個 worker 時，請求指標寫入共用目錄，/metrics 彙總所有 worker 的數值
+# 必須在載入應用程式（preload_app 會在 on_starting 之前載入）之前設定並清除上次執行留下的檔案，
+# 避免已結束的 worker 數值被重複計算
+if os.getenv('METRICS_ENABLED', 'true').lower() in ('true', '1'):
+    metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+    os.makedirs(metrics_dir, exist_ok=True)
+    for name in os.listdir(metrics_dir):
+        if name.endswith('.db'):
+            os.remove(os.path.join(metrics_dir, name))
+
+# 監聽位址
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 5000)}"
+
+# Worker 模型：多行程 × 每行程多執行緒（gthread）
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+# gevent 模式下每個 worker 的最大同時連線數
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# 多 worker 時各自的記憶體使用者快取無法互相清除（更新個人資料後其他 worker 仍回傳舊資料直到過期），
+# 未指定 USER_CACHE_TTL 時縮短為 5 秒；需要跨 worker 立即一致時設定 USER_CACHE_BACKEND=redis
+if workers > 1 and os.getenv('USER_CACHE_BACKEND', 'memory') == 'memory':
+    os.environ.setdefault('USER_CACHE_TTL', '5')
+
+# 連線與逾時
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+backlog = int(os.getenv('GUNICORN_BACKLOG', 2048))
+
+# 定期重啟 worker，避免記憶體長期累積
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# 在 master 預先載入應用程式，fork 後各 worker 共用唯讀記憶體
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# 開發時可開啟自動重新載入
+reload = os.getenv('GUNICORN_RELOAD', 'false').lower() == 'true'
+
+# 日誌輸出到 stdout / stderr
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """fork 後的 worker 初始化
+
+    1. 在 worker 仍是單一執行緒時先啟動密碼雜湊行程池（MongoClient 會建立背景執行緒）
+    2. 捨棄從 master 繼承的 MongoClient，由各 worker 自行建立連線並預熱連線池
+    """
+    from utils.passwords import hasher
+    hasher.warm_up()
+
+    from config.database import db
+    db.reset()
+    if os.getenv('MONGODB_WARM_UP', 'true').lower() == 'true':
+        try:
+            db.warm_up()
+        except Exception as e:
+            # 預熱失敗不阻止 worker 啟動，第一個請求時會再次嘗試連線
+            server.log.warning(f"MongoDB 連線預熱失敗: {e}")
+
+
+def worker_exit(server, worker):
+    """worker 結束時記錄連線池統計，作為調整連線池大小的參考"""
+    from config.database import db
+    from utils.passwords import hasher
+    server.log.info(f"MongoDB 連線池統計 (pid {worker.pid}): {db.get_pool_stats()}")
+    hasher.shutdown()
+
+
+def child_exit(server, worker):
+    """worker 結束後移除其處理中請求數（livesum），延遲與次數仍保留在彙總中"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,8 +1,59 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from config.database import db
+from models.leave_summary import LeaveSummary
+from utils.mongo import projection, mongo_lock
+from utils.pagination import keyset_filter, keyset_sort
+from utils.text import ngram_tokens
+
+# 欄位與預設值（查詢結果缺少欄位時使用）
+FIELD_DEFAULTS = {
+    'user_id': None,
+    'leave_type': '',
+    'start_date': None,
+    'end_date': None,
+    'reason': '',
+    'status': 'pending',
+    'emergency_contact': '',
+    'teacher_note': '',
+    'attachment_url': '',
+    'approved_by': None,
+    'approved_at': None,
+    'rejected_reason': '',
+    'created_at': None,
+    'updated_at': None
+}
+
+# 清單版本（ETag 用）：{_id: 'pending' | 'user:<user_id>', version: ObjectId}
+LIST_VERSIONS = 'list_versions'
+
+# 匯出順序（對應 (start_date, _id) 索引，資料庫端不需排序）
+EXPORT_SORT = [('start_date', 1), ('_id', 1)]
+
+# 會與新申請衝突的狀態（已拒絕的申請不佔用日期）
+ACTIVE_STATUSES = ('pending', 'approved')
+
+# 重疊檢查回傳的欄位
+OVERLAP_FIELDS = ('leave_type', 'start_date', 'end_date', 'status')
+
+# 待審核清單需要的欄位（審核結果相關欄位在待審核狀態下皆為空值）
+PENDING_LIST_FIELDS = (
+    'user_id', 'leave_type', 'start_date', 'end_date', 'reason',
+    'status', 'emergency_contact', 'created_at', 'updated_at'
+)
+
+def request_projection(fields=None):
+    """請假申請的 projection：指定欄位時只取這些欄位，否則取回搜尋詞元（reason_ngrams）以外的全部欄位
+    
+    搜尋詞元只用於查詢條件，可能比請假原因本身更大
+    """
+    return projection(fields) or {'reason_ngrams': 0}
 
 class LeaveRequest:
+    __slots__ = ('_id',) + tuple(FIELD_DEFAULTS)
+    
     def __init__(self, user_id, leave_type, start_date, end_date, reason, **kwargs):
         self.user_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
         self.leave_type = leave_type
@@ -22,24 +73,11 @@ class LeaveRequest:
         self.rejected_reason = kwargs.get('rejected_reason', '')
     
     def to_dict(self):
-        """轉換為字典格式"""
-        return {
-            '_id': str(self._id) if hasattr(self, '_id') else None,
-            'user_id': str(self.user_id),
-            'leave_type': self.leave_type,
-            'start_date': self.start_date.isoformat() if isinstance(self.start_date, datetime) else self.start_date,
-            'end_date': self.end_date.isoformat() if isinstance(self.end_date, datetime) else self.end_date,
-            'reason': self.reason,
-            'status': self.status,
-            'emergency_contact': self.emergency_contact,
-            'teacher_note': self.teacher_note,
-            'attachment_url': self.attachment_url,
-            'approved_by': str(self.approved_by) if self.approved_by else None,
-            'approved_at': self.approved_at.isoformat() if self.approved_at else None,
-            'rejected_reason': self.rejected_reason,
-            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            'updated_at': self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
-        }
+        """轉換為字典格式（datetime 與 ObjectId 由 JSON provider 序列化）"""
+        result = {'_id': getattr(self, '_id', None)}
+        for field in FIELD_DEFAULTS:
+            result[field] = getattr(self, field)
+        return result
     
     def save(self):
         """儲存請假申請到資料庫"""
@@ -58,32 +96,161 @@ class LeaveRequest:
             'approved_at': self.approved_at,
             'rejected_reason': self.rejected_reason,
             'created_at': self.created_at,
-            'updated_at': self.updated_at
+            'updated_at': self.updated_at,
+            # 請假原因的 n-gram 詞元（搜尋用，不輸出到 API）
+            'reason_ngrams': ngram_tokens(self.reason)
         }
         
         result = collection.insert_one(leave_data)
         self._id = result.inserted_id
+        LeaveSummary.record_created(leave_data)
+        self.bump_list_versions([self.user_id])
         return str(self._id)
     
-    def update(self, **kwargs):
-        """更新請假申請"""
+    def save_without_overlap(self):
+        """檢查同一學生沒有日期重疊的申請後才儲存，回傳重疊的申請（原始文件清單，空清單表示已儲存）
+        
+        檢查與寫入在同一學生的鎖內進行，同時送出的申請不會都通過檢查；
+        無法在時間內取得鎖時拋出 LockNotAcquired
+        """
+        with mongo_lock('leave_apply', self.user_id):
+            overlaps = self.find_overlapping(self.user_id, self.start_date, self.end_date)
+            if overlaps:
+                return overlaps
+            self.save()
+            return []
+    
+    @staticmethod
+    def find_overlapping(user_id, start_date, end_date, limit=10):
+        """查找學生與指定期間重疊的待審核 / 已核准申請（日期含首尾）
+        
+        使用 (user_id, end_date, start_date) 索引：歷史申請大多已結束，
+        以 end_date >= 開始日期為索引範圍只會掃描近期與未來的申請，不需掃描全部歷史
+        """
         collection = db.get_collection('leave_requests')
+        query = {
+            'user_id': ObjectId(user_id) if isinstance(user_id, str) else user_id,
+            'end_date': {'$gte': start_date},
+            'start_date': {'$lte': end_date},
+            'status': {'$in': list(ACTIVE_STATUSES)}
+        }
+        return list(collection.find(query, projection(OVERLAP_FIELDS)).limit(limit))
+    
+    @classmethod
+    def review(cls, request_id, status, reviewer_id, teacher_note='', rejected_reason=''):
+        """審核請假申請（approved / rejected）
         
-        # 可更新的欄位
-        update_data = {}
-        for field in ['status', 'teacher_note', 'approved_by', 'approved_at', 'rejected_reason']:
-            if field in kwargs:
-                update_data[field] = kwargs[field]
-                setattr(self, field, kwargs[field])
+        以單次 find_one_and_update 完成，條件包含 status: pending，
+        多位老師同時審核時只有一位會成功。成功時回傳更新後的 LeaveRequest，
+        申請不存在或已被處理時回傳 None
+        """
+        collection = db.get_collection('leave_requests')
+        try:
+            object_id = ObjectId(request_id)
+        except Exception:
+            return None
+        
+        now = datetime.utcnow()
+        update_data = {
+            'status': status,
+            'approved_by': reviewer_id,
+            'approved_at': now,
+            'teacher_note': teacher_note,
+            'updated_at': now
+        }
+        if status == 'rejected':
+            update_data['rejected_reason'] = rejected_reason
+        
+        request_data = collection.find_one_and_update(
+            {'_id': object_id, 'status': 'pending'},
+            {'$set': update_data},
+            projection=request_projection(),
+            return_document=ReturnDocument.AFTER
+        )
+        if request_data:
+            LeaveSummary.record_transitions([(request_data, 'pending', status)])
+            cls.bump_list_versions([request_data['user_id']])
+            return cls.from_document(request_data)
+        return None
+    
+    @classmethod
+    def bulk_review(cls, reviews, reviewer_id):
+        """批次審核請假申請
+        
+        reviews 為 [{'_id': ObjectId, 'status': 'approved'|'rejected', 'teacher_note', 'rejected_reason'}]。
+        所有更新以一次 bulk_write 送出，每筆條件都包含 status: pending，
+        已被處理的申請不會被覆寫；再以一次查詢確認每筆的結果。
+        每次呼叫寫入唯一的 review_batch，同一位老師重複送出時也只有實際寫入的那次會判定為已審核。
+        部分寫入失敗（BulkWriteError）時，已寫入的項目仍會計入彙總並回報，其餘回報 failed。
+        回傳 {_id: 'reviewed'|'processed'|'not_found'|'failed'}
+        """
+        if not reviews:
+            return {}
         
-        update_data['updated_at'] = datetime.utcnow()
-        self.updated_at = update_data['updated_at']
+        collection = db.get_collection('leave_requests')
+        now = datetime.utcnow()
+        batch = ObjectId()
+        
+        operations = [
+            UpdateOne(
+                {'_id': review['_id'], 'status': 'pending'},
+                {'$set': {
+                    'status': review['status'],
+                    'approved_by': reviewer_id,
+                    'approved_at': now,
+                    'teacher_note': review.get('teacher_note', ''),
+                    'rejected_reason': review.get('rejected_reason', ''),
+                    'review_batch': batch,
+                    'updated_at': now
+                }}
+            )
+            for review in reviews
+        ]
+        try:
+            collection.bulk_write(operations, ordered=False)
+        except BulkWriteError:
+            # 未寫入的申請仍為 pending，由下方的查詢判定為 failed
+            pass
         
-        collection.update_one(
-            {'_id': self._id},
-            {'$set': update_data}
+        # 由本次的 review_batch 判斷哪些申請是本次更新的
+        ids = [review['_id'] for review in reviews]
+        outcomes = {object_id: 'not_found' for object_id in ids}
+        cursor = collection.find(
+            {'_id': {'$in': ids}},
+            {'review_batch': 1, 'status': 1,
+             'user_id': 1, 'leave_type': 1, 'start_date': 1, 'end_date': 1}
         )
-        return True
+        transitions = []
+        for request_data in cursor:
+            if request_data.get('review_batch') == batch:
+                outcomes[request_data['_id']] = 'reviewed'
+                transitions.append((request_data, 'pending', request_data['status']))
+            elif request_data.get('status') == 'pending':
+                outcomes[request_data['_id']] = 'failed'
+            else:
+                outcomes[request_data['_id']] = 'processed'
+        
+        LeaveSummary.record_transitions(transitions)
+        if transitions:
+            cls.bump_list_versions([request_data['user_id'] for request_data, _, _ in transitions])
+        return outcomes
+    
+    @classmethod
+    def from_document(cls, request_data):
+        """由 MongoDB 文件建立 LeaveRequest 物件（缺少的欄位使用預設值）"""
+        leave_request = cls.__new__(cls)
+        leave_request._id = request_data['_id']
+        for field, default in FIELD_DEFAULTS.items():
+            setattr(leave_request, field, request_data.get(field, default))
+        return leave_request
+    
+    @staticmethod
+    def document_to_dict(request_data, fields=None):
+        """將原始 MongoDB 文件直接轉換為回應用字典（與 to_dict 輸出相同格式）"""
+        result = {'_id': request_data['_id']}
+        for field in fields or FIELD_DEFAULTS:
+            result[field] = request_data.get(field, FIELD_DEFAULTS[field])
+        return result
     
     @staticmethod
     def validate_dates(start_date, end_date):
@@ -108,96 +275,271 @@ class LeaveRequest:
             return False, f"日期格式錯誤: {str(e)}"
     
     @classmethod
-    def find_by_user_id(cls, user_id, limit=None, status=None):
-        """根據使用者 ID 查找請假申請"""
+    def find_by_user_id(cls, user_id, limit=None, status=None, after=None, fields=None, lean=False):
+        """根據使用者 ID 查找請假申請（依建立時間新到舊，after 為上一頁最後一筆的位置）
+        
+        fields 指定要取回的欄位；lean=True 時直接回傳原始文件，不建立 LeaveRequest 物件
+        """
         collection = db.get_collection('leave_requests')
         
         query = {'user_id': ObjectId(user_id) if isinstance(user_id, str) else user_id}
         if status:
             query['status'] = status
+        if after:
+            query.update(keyset_filter(after, descending=True))
         
-        cursor = collection.find(query).sort('created_at', -1)
+        cursor = collection.find(query, request_projection(fields)).sort(keyset_sort(descending=True))
         if limit:
             cursor = cursor.limit(limit)
         
-        requests = []
+        if lean:
+            return list(cursor)
+        return [cls.from_document(request_data) for request_data in cursor]
+    
+    @staticmethod
+    def statistics(start=None, end=None, status=None, top_students=50):
+        """請假統計（以單一 aggregation 在資料庫端計算，不取回原始資料）
+        
+        start / end 篩選請假開始日期範圍（end 不含），status 篩選申請狀態；
+        回傳依狀態、假別、月份、班級的筆數與天數，以及請假天數最多的學生
+        """
+        collection = db.get_collection('leave_requests')
+        
+        match = {}
+        if start or end:
+            match['start_date'] = {}
+            if start:
+                match['start_date']['$gte'] = start
+            if end:
+                match['start_date']['$lt'] = end
+        if status:
+            match['status'] = status
+        
+        # 請假天數（含首尾日）
+        days = {'$add': [
+            {'$floor': {'$divide': [{'$subtract': ['$end_date', '$start_date']}, 86400000]}}, 1
+        ]}
+        count_and_days = {'count': {'$sum': 1}, 'days': {'$sum': '$days'}}
+        
+        pipeline = [
+            {'$match': match},
+            {'$project': {'user_id': 1, 'status': 1, 'leave_type': 1, 'start_date': 1, 'days': days}},
+            {'$facet': {
+                'by_status': [
+                    {'$group': {'_id': '$status', **count_and_days}}
+                ],
+                'by_leave_type': [
+                    {'$group': {'_id': '$leave_type', **count_and_days}}
+                ],
+                'by_month': [
+                    {'$group': {'_id': {'$dateToString': {'format': '%Y-%m', 'date': '$start_date'}}, **count_and_days}},
+                    {'$sort': {'_id': 1}}
+                ],
+                # 先依學生彙總，每位學生只需關聯一次使用者資料
+                'by_class': [
+                    {'$group': {'_id': '$user_id', **count_and_days}},
+                    {'$lookup': {'from': 'users', 'localField': '_id', 'foreignField': '_id', 'as': 'user'}},
+                    {'$unwind': {'path': '$user', 'preserveNullAndEmptyArrays': True}},
+                    {'$group': {
+                        '_id': {'$ifNull': ['$user.class_name', '']},
+                        'count': {'$sum': '$count'},
+                        'days': {'$sum': '$days'},
+                        'students': {'$sum': 1}
+                    }},
+                    {'$sort': {'_id': 1}}
+                ],
+                'students': [
+                    {'$group': {'_id': '$user_id', **count_and_days}},
+                    {'$sort': {'days': -1, 'count': -1, '_id': 1}},
+                    {'$limit': top_students},
+                    {'$lookup': {'from': 'users', 'localField': '_id', 'foreignField': '_id', 'as': 'user'}},
+                    {'$unwind': {'path': '$user', 'preserveNullAndEmptyArrays': True}},
+                    {'$project': {
+                        'count': 1, 'days': 1,
+                        'name': '$user.name', 'student_id': '$user.student_id', 'class_name': '$user.class_name'
+                    }}
+                ]
+            }}
+        ]
+        result = next(collection.aggregate(pipeline), None) or {}
+        
+        def grouped(key, name):
+            return [
+                {name: row['_id'], **{field: row[field] for field in row if field != '_id'}}
+                for row in result.get(key, [])
+            ]
+        
+        return {
+            'total': sum(row['count'] for row in result.get('by_status', [])),
+            'by_status': grouped('by_status', 'status'),
+            'by_leave_type': grouped('by_leave_type', 'leave_type'),
+            'by_month': grouped('by_month', 'month'),
+            'by_class': grouped('by_class', 'class_name'),
+            'students': [
+                {
+                    'user_id': row['_id'],
+                    'name': row.get('name', ''),
+                    'student_id': row.get('student_id', ''),
+                    'class_name': row.get('class_name', ''),
+                    'count': row['count'],
+                    'days': row['days']
+                }
+                for row in result.get('students', [])
+            ]
+        }
+    
+    @staticmethod
+    def iter_export(start=None, end=None, status=None, leave_type=None, user_id=None, batch_size=500):
+        """依條件逐批讀取請假申請（原始文件），供匯出使用
+        
+        回傳 MongoDB cursor，每次向資料庫取回 batch_size 筆，不會一次載入全部資料
+        """
+        collection = db.get_collection('leave_requests')
+        
+        query = {}
+        if start or end:
+            query['start_date'] = {}
+            if start:
+                query['start_date']['$gte'] = start
+            if end:
+                query['start_date']['$lt'] = end
+        if status:
+            query['status'] = status
+        if leave_type:
+            query['leave_type'] = leave_type
+        if user_id:
+            query['user_id'] = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        
+        return collection.find(query, request_projection()).sort(EXPORT_SORT).batch_size(batch_size)
+    
+    @staticmethod
+    def backfill_reason_ngrams(batch_size=1000):
+        """為尚未建立搜尋詞元的請假申請補上 reason_ngrams，回傳更新筆數"""
+        collection = db.get_collection('leave_requests')
+        cursor = collection.find({'reason_ngrams': {'$exists': False}}, {'reason': 1}).batch_size(batch_size)
+        
+        updated = 0
+        operations = []
         for request_data in cursor:
-            leave_request = cls.__new__(cls)
-            leave_request._id = request_data['_id']
-            leave_request.user_id = request_data['user_id']
-            leave_request.leave_type = request_data['leave_type']
-            leave_request.start_date = request_data['start_date']
-            leave_request.end_date = request_data['end_date']
-            leave_request.reason = request_data['reason']
-            leave_request.status = request_data['status']
-            leave_request.emergency_contact = request_data.get('emergency_contact', '')
-            leave_request.teacher_note = request_data.get('teacher_note', '')
-            leave_request.attachment_url = request_data.get('attachment_url', '')
-            leave_request.approved_by = request_data.get('approved_by')
-            leave_request.approved_at = request_data.get('approved_at')
-            leave_request.rejected_reason = request_data.get('rejected_reason', '')
-            leave_request.created_at = request_data['created_at']
-            leave_request.updated_at = request_data['updated_at']
-            requests.append(leave_request)
-        
-        return requests
+            operations.append(UpdateOne(
+                {'_id': request_data['_id']},
+                {'$set': {'reason_ngrams': ngram_tokens(request_data.get('reason', ''))}}
+            ))
+            if len(operations) >= batch_size:
+                updated += collection.bulk_write(operations, ordered=False).modified_count
+                operations = []
+        if operations:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+        return updated
+    
+    @staticmethod
+    def count_reviewed_since(since):
+        """計算指定時間之後審核（核准或拒絕）的申請數"""
+        collection = db.get_collection('leave_requests')
+        return collection.count_documents({'approved_at': {'$gte': since}})
+    
+    @staticmethod
+    def search_query(text=None, date_from=None, date_to=None, leave_type=None, status=None,
+                     user_ids=None, reviewer_id=None):
+        """組合搜尋條件（每種條件都有對應的複合索引，見 config/indexes.py）
+        
+        text 比對請假原因（全部詞元都需出現）；date_from / date_to 為請假期間重疊的範圍；
+        user_ids 為申請人清單，reviewer_id 為審核人
+        """
+        query = {}
+        if text:
+            tokens = ngram_tokens(text, query=True)
+            if tokens:
+                query['reason_ngrams'] = {'$all': tokens}
+        # 請假期間與查詢範圍重疊：開始日期不晚於範圍結束，且結束日期不早於範圍開始
+        if date_to:
+            query['start_date'] = {'$lt': date_to}
+        if date_from:
+            query['end_date'] = {'$gte': date_from}
+        if leave_type:
+            query['leave_type'] = leave_type
+        if status:
+            query['status'] = status
+        if user_ids is not None:
+            query['user_id'] = {'$in': list(user_ids)}
+        if reviewer_id:
+            query['approved_by'] = reviewer_id
+        return query
+    
+    @classmethod
+    def search(cls, query, limit=None, after=None, fields=None):
+        """依 search_query 的條件搜尋（依建立時間新到舊，回傳原始文件）"""
+        collection = db.get_collection('leave_requests')
+        if after:
+            query = {**query, **keyset_filter(after, descending=True)}
+        
+        cursor = collection.find(query, request_projection(fields)).sort(keyset_sort(descending=True))
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+    
+    @staticmethod
+    def bump_list_versions(user_ids, pending=True):
+        """清單內容改變後更新版本：申請人的請假記錄清單，以及（預設）待審核清單
+        
+        版本為新的 ObjectId 而非遞增數字，集合重建後也不會與用戶端保存的舊版本相同。
+        須在寫入申請之後呼叫：寫入與更新版本之間讀到的新內容仍使用舊版本，下一次請求即會更新
+        """
+        keys = [f'user:{user_id}' for user_id in set(user_ids)]
+        if pending:
+            keys.append('pending')
+        if not keys:
+            return
+        collection = db.get_collection(LIST_VERSIONS)
+        collection.bulk_write([
+            UpdateOne({'_id': key}, {'$set': {'version': ObjectId()}}, upsert=True) for key in keys
+        ], ordered=False)
+    
+    @staticmethod
+    def _list_version(key):
+        """清單的版本（以 _id 查詢一份文件），尚未有任何變更時為 None"""
+        version = db.get_collection(LIST_VERSIONS).find_one({'_id': key})
+        return version['version'] if version else None
+    
+    @classmethod
+    def user_list_version(cls, user_id):
+        """使用者請假記錄清單的版本（用於 ETag，任一筆申請新增或審核時改變）"""
+        return cls._list_version(f'user:{user_id}')
+    
+    @classmethod
+    def pending_list_version(cls):
+        """待審核清單的版本（用於 ETag）"""
+        return cls._list_version('pending')
     
     @classmethod
-    def find_by_id(cls, request_id):
+    def find_by_id(cls, request_id, fields=None):
         """根據 ID 查找請假申請"""
         collection = db.get_collection('leave_requests')
         try:
-            request_data = collection.find_one({'_id': ObjectId(request_id)})
+            request_data = collection.find_one({'_id': ObjectId(request_id)}, request_projection(fields))
         except:
             return None
             
         if request_data:
-            leave_request = cls.__new__(cls)
-            leave_request._id = request_data['_id']
-            leave_request.user_id = request_data['user_id']
-            leave_request.leave_type = request_data['leave_type']
-            leave_request.start_date = request_data['start_date']
-            leave_request.end_date = request_data['end_date']
-            leave_request.reason = request_data['reason']
-            leave_request.status = request_data['status']
-            leave_request.emergency_contact = request_data.get('emergency_contact', '')
-            leave_request.teacher_note = request_data.get('teacher_note', '')
-            leave_request.attachment_url = request_data.get('attachment_url', '')
-            leave_request.approved_by = request_data.get('approved_by')
-            leave_request.approved_at = request_data.get('approved_at')
-            leave_request.rejected_reason = request_data.get('rejected_reason', '')
-            leave_request.created_at = request_data['created_at']
-            leave_request.updated_at = request_data['updated_at']
-            return leave_request
+            return cls.from_document(request_data)
         return None
     
     @classmethod
-    def find_all_pending(cls, limit=None):
-        """查找所有待審核的請假申請"""
+    def find_all_pending(cls, limit=None, after=None, fields=None, lean=False):
+        """查找待審核的請假申請（依建立時間舊到新，after 為上一頁最後一筆的位置）
+        
+        fields 指定要取回的欄位；lean=True 時直接回傳原始文件，不建立 LeaveRequest 物件
+        """
         collection = db.get_collection('leave_requests')
         
-        cursor = collection.find({'status': 'pending'}).sort('created_at', 1)
+        query = {'status': 'pending'}
+        if after:
+            query.update(keyset_filter(after))
+        
+        cursor = collection.find(query, request_projection(fields)).sort(keyset_sort())
         if limit:
             cursor = cursor.limit(limit)
         
-        requests = []
-        for request_data in cursor:
-            leave_request = cls.__new__(cls)
-            leave_request._id = request_data['_id']
-            leave_request.user_id = request_data['user_id']
-            leave_request.leave_type = request_data['leave_type']
-            leave_request.start_date = request_data['start_date']
-            leave_request.end_date = request_data['end_date']
-            leave_request.reason = request_data['reason']
-            leave_request.status = request_data['status']
-            leave_request.emergency_contact = request_data.get('emergency_contact', '')
-            leave_request.teacher_note = request_data.get('teacher_note', '')
-            leave_request.attachment_url = request_data.get('attachment_url', '')
-            leave_request.approved_by = request_data.get('approved_by')
-            leave_request.approved_at = request_data.get('approved_at')
-            leave_request.rejected_reason = request_data.get('rejected_reason', '')
-            leave_request.created_at = request_data['created_at']
-            leave_request.updated_at = request_data['updated_at']
-            requests.append(leave_request)
-        
-        return requests
+        if lean:
+            return list(cursor)
+        return [cls.from_document(request_data) for request_data in cursor]
@@ -0,0 +1,116 @@
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from config.database import db
+
+# 每位學生每學期一份彙總文件，依 (user_id, term) 查詢
+COLLECTION = 'leave_summaries'
+
+def term_of(date):
+    """學期代碼：8 月至隔年 1 月為上學期（-1），2 月至 7 月為下學期（-2），以學年開始的西元年表示"""
+    if date.month >= 8:
+        return f'{date.year}-1'
+    if date.month == 1:
+        return f'{date.year - 1}-1'
+    return f'{date.year - 1}-2'
+
+def leave_days(start_date, end_date):
+    """請假天數（含首尾日），與統計報表的計算方式相同"""
+    return int((end_date - start_date).total_seconds() // 86400) + 1
+
+def _field_name(leave_type):
+    """假別作為欄位名稱，不可包含 . 與 $"""
+    return str(leave_type).replace('.', '_').replace('$', '_')
+
+def _increments(request_data, status, sign):
+    """某筆申請計入（sign=1）或移出（sign=-1）指定狀態時的 $inc 內容"""
+    prefix = f"stats.{status}.{_field_name(request_data['leave_type'])}"
+    return {
+        f'{prefix}.count': sign,
+        f'{prefix}.days': sign * leave_days(request_data['start_date'], request_data['end_date'])
+    }
+
+def _key(request_data):
+    return {'user_id': request_data['user_id'], 'term': term_of(request_data['start_date'])}
+
+class LeaveSummary:
+    """學生每學期的請假彙總（依狀態、假別的筆數與天數）
+
+    於申請建立與審核時以 $inc 增量更新，查詢「某學生本學期已請幾天病假」只需一次索引查詢。
+    彙總與申請不在同一個交易中更新，異常中斷時可用 rebuild() 由請假申請重新計算。
+    文件格式: {user_id, term, stats: {status: {leave_type: {count, days}}}, updated_at}
+    """
+
+    @staticmethod
+    def record_created(request_data):
+        """新申請（待審核）計入彙總"""
+        collection = db.get_collection(COLLECTION)
+        collection.update_one(
+            _key(request_data),
+            {'$inc': _increments(request_data, request_data.get('status', 'pending'), 1),
+             '$set': {'updated_at': datetime.utcnow()}},
+            upsert=True
+        )
+
+    @staticmethod
+    def record_transitions(transitions):
+        """審核造成的狀態轉換 [(申請文件, 原狀態, 新狀態)]，以一次 bulk_write 更新"""
+        if not transitions:
+            return
+        collection = db.get_collection(COLLECTION)
+        now = datetime.utcnow()
+        operations = []
+        for request_data, old_status, new_status in transitions:
+            increments = _increments(request_data, old_status, -1)
+            increments.update(_increments(request_data, new_status, 1))
+            operations.append(UpdateOne(
+                _key(request_data),
+                {'$inc': increments, '$set': {'updated_at': now}},
+                upsert=True
+            ))
+        collection.bulk_write(operations, ordered=False)
+
+    @staticmethod
+    def find(user_id, term=None):
+        """取得學生某學期（預設為本學期）的彙總，沒有任何申請時回傳空的統計"""
+        collection = db.get_collection(COLLECTION)
+        user_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        term = term or term_of(datetime.utcnow())
+        summary = collection.find_one({'user_id': user_id, 'term': term}, {'_id': 0, 'updated_at': 0})
+        return summary or {'user_id': user_id, 'term': term, 'stats': {}}
+
+    @staticmethod
+    def rebuild():
+        """由所有請假申請重新計算彙總（用於修復），回傳彙總文件數
+
+        先寫入暫存集合再以 rename 取代，重建期間讀取不會看到不完整的資料。
+        重建期間的申請與審核仍以 $inc 更新舊集合，rename 後這些更新會遺失，
+        因此只能在停止服務（或暫停申請與審核）的維護時段執行
+        """
+        source = db.get_collection('leave_requests')
+        summaries = {}
+        cursor = source.find({}, {'user_id': 1, 'status': 1, 'leave_type': 1, 'start_date': 1, 'end_date': 1})
+        for request_data in cursor:
+            if not request_data.get('start_date') or not request_data.get('end_date'):
+                continue
+            key = (request_data['user_id'], term_of(request_data['start_date']))
+            stats = summaries.setdefault(key, {})
+            entry = stats.setdefault(request_data.get('status', 'pending'), {}).setdefault(
+                _field_name(request_data.get('leave_type', '')), {'count': 0, 'days': 0}
+            )
+            entry['count'] += 1
+            entry['days'] += leave_days(request_data['start_date'], request_data['end_date'])
+
+        now = datetime.utcnow()
+        staging = db.get_collection(f'{COLLECTION}_rebuild')
+        staging.drop()
+        if summaries:
+            staging.insert_many([
+                {'user_id': user_id, 'term': term, 'stats': stats, 'updated_at': now}
+                for (user_id, term), stats in summaries.items()
+            ])
+            staging.create_index([('user_id', 1), ('term', 1)], unique=True)
+            staging.rename(COLLECTION, dropTarget=True)
+        else:
+            db.get_collection(COLLECTION).delete_many({})
+        return len(summaries)
@@ -1,13 +1,72 @@
 from datetime import datetime
+from itertools import islice
 from bson import ObjectId
-from werkzeug.security import generate_password_hash, check_password_hash
+from pymongo.errors import BulkWriteError
+from flask import g, has_request_context
 from config.database import db
+from utils.cache import create_cache
+from utils.mongo import projection
+from utils.passwords import hasher
+import csv
+import os
 import re
 
+# 欄位與預設值（查詢結果缺少欄位時使用）
+FIELD_DEFAULTS = {
+    'email': '',
+    'password_hash': None,
+    'role': 'student',
+    'name': '',
+    'student_id': '',
+    'class_name': '',
+    'is_active': True,
+    'created_at': None,
+    'updated_at': None
+}
+
+# 不含密碼雜湊的個人資料欄位
+PROFILE_FIELDS = tuple(field for field in FIELD_DEFAULTS if field != 'password_hash')
+
+PROFILE_SET = frozenset(PROFILE_FIELDS)
+
+# 申請人摘要欄位
+SUMMARY_FIELDS = ('name', 'email', 'student_id')
+
+# 跨請求的使用者資料快取（只保存不含密碼雜湊的個人資料文件）
+# memory 為各行程各自的快取：更新個人資料只清除處理該請求的 worker，其他 worker 最多 USER_CACHE_TTL 秒內仍回傳舊資料；
+# gunicorn 多 worker 時未設定 USER_CACHE_TTL 預設為 5 秒（見 gunicorn.conf.py），需要立即一致時使用 redis
+profile_cache = create_cache(
+    os.getenv('USER_CACHE_BACKEND', 'memory'),
+    maxsize=int(os.getenv('USER_CACHE_SIZE', 10000)),
+    ttl=int(os.getenv('USER_CACHE_TTL', 30)),
+    url=os.getenv('USER_CACHE_URL'),
+    namespace='user'
+)
+
+# 批次匯入：每批雜湊與寫入的筆數、HTTP 單次匯入上限
+# 成本 10 的 bcrypt 每筆約 90ms（單核），上限需讓請求在 nginx 的 60 秒逾時內完成；更多帳號使用 flask import-users
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 1000))
+MAX_IMPORT_ROWS = int(os.getenv('MAX_IMPORT_ROWS', 500))
+
+# 匯入帳號的初始密碼雜湊成本；使用者第一次登入時會自動升級為 BCRYPT_ROUNDS
+IMPORT_BCRYPT_ROUNDS = int(os.getenv('IMPORT_BCRYPT_ROUNDS', 10))
+
+IMPORT_ROLES = ('student', 'teacher', 'admin')
+
+def _request_cache():
+    """取得目前請求範圍的使用者快取 {user_id: (欄位集合, User)}，不在請求中時回傳 None"""
+    if not has_request_context():
+        return None
+    if 'user_cache' not in g:
+        g.user_cache = {}
+    return g.user_cache
+
 class User:
+    __slots__ = ('_id',) + tuple(FIELD_DEFAULTS)
+    
     def __init__(self, email, password, role='student', **kwargs):
         self.email = email
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hasher.hash(password)
         self.role = role
         self.created_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
@@ -15,16 +74,18 @@ class User:
         # 可選欄位
         self.name = kwargs.get('name', '')
         self.student_id = kwargs.get('student_id', '')
+        self.class_name = kwargs.get('class_name', '')
         self.is_active = kwargs.get('is_active', True)
     
     def to_dict(self):
         """轉換為字典格式（不包含密碼）"""
         return {
-            '_id': str(self._id) if hasattr(self, '_id') else None,
+            '_id': getattr(self, '_id', None),
             'email': self.email,
             'role': self.role,
             'name': self.name,
             'student_id': self.student_id,
+            'class_name': self.class_name,
             'is_active': self.is_active,
             'created_at': self.created_at,
             'updated_at': self.updated_at
@@ -39,6 +100,7 @@ class User:
             'role': self.role,
             'name': self.name,
             'student_id': self.student_id,
+            'class_name': self.class_name,
             'is_active': self.is_active,
             'created_at': self.created_at,
             'updated_at': self.updated_at
@@ -46,11 +108,167 @@ class User:
         
         result = collection.insert_one(user_data)
         self._id = result.inserted_id
+        self.invalidate_cache(self._id)
         return str(self._id)
     
+    @staticmethod
+    def bulk_create(rows, rounds=None):
+        """批次建立使用者
+        
+        rows 為 [{'email', 'password', 'role', 'name', 'student_id', 'class_name'}]（須已驗證）。
+        密碼雜湊分散到行程池計算，再以 ordered=False 的 insert_many 一次寫入，
+        Email 重複（唯一索引衝突）的資料列不影響其他資料列。
+        回傳 (建立筆數, {rows 索引: 錯誤訊息})
+        """
+        if not rows:
+            return 0, {}
+        
+        password_hashes = hasher.hash_many([row['password'] for row in rows], rounds=rounds)
+        now = datetime.utcnow()
+        documents = [
+            {
+                'email': row['email'],
+                'password_hash': password_hash,
+                'role': row.get('role') or 'student',
+                'name': row.get('name', ''),
+                'student_id': row.get('student_id', ''),
+                'class_name': row.get('class_name', ''),
+                'is_active': True,
+                'created_at': now,
+                'updated_at': now
+            }
+            for row, password_hash in zip(rows, password_hashes)
+        ]
+        
+        collection = db.get_collection('users')
+        try:
+            result = collection.insert_many(documents, ordered=False)
+            return len(result.inserted_ids), {}
+        except BulkWriteError as e:
+            errors = {}
+            for error in e.details.get('writeErrors', []):
+                errors[error['index']] = '此 Email 已被註冊' if error.get('code') == 11000 else error.get('errmsg', '寫入失敗')
+            return e.details.get('nInserted', 0), errors
+    
+    @classmethod
+    def validate_import_row(cls, row, seen_emails):
+        """驗證匯入的資料列，回傳 (整理後的資料, 錯誤訊息)"""
+        email = (row.get('email') or '').lower().strip()
+        password = row.get('password') or ''
+        role = (row.get('role') or 'student').strip()
+        
+        if not email or not password:
+            return None, '請提供 email 和密碼'
+        if not cls.validate_email(email):
+            return None, '請輸入正確的 Email 格式'
+        if not cls.validate_password(password):
+            return None, '密碼長度至少 6 碼'
+        if role not in IMPORT_ROLES:
+            return None, '無效的角色'
+        if email in seen_emails:
+            return None, '檔案中 Email 重複'
+        
+        seen_emails.add(email)
+        return {
+            'email': email,
+            'password': password,
+            'role': role,
+            'name': (row.get('name') or '').strip(),
+            'student_id': (row.get('student_id') or '').strip(),
+            'class_name': (row.get('class_name') or '').strip()
+        }, None
+    
+    @classmethod
+    def import_csv(cls, text_stream, batch_size=IMPORT_BATCH_SIZE, max_rows=MAX_IMPORT_ROWS,
+                   rounds=IMPORT_BCRYPT_ROUNDS):
+        """由 CSV 批次建立帳號，逐批讀取、驗證、雜湊並寫入，不會一次載入整個檔案
+        
+        CSV 欄位: email, password, name, student_id, class_name, role（預設 student）。
+        回傳 (建立筆數, 失敗的資料列 [{'row', 'email', 'message'}])；缺少必要欄位時拋出 ValueError
+        """
+        reader = csv.DictReader(text_stream)
+        if not reader.fieldnames or 'email' not in reader.fieldnames or 'password' not in reader.fieldnames:
+            raise ValueError('CSV 需包含 email 與 password 欄位')
+        
+        created = 0
+        errors = []
+        seen_emails = set()
+        total = 0
+        
+        while total < max_rows:
+            rows = list(islice(reader, min(batch_size, max_rows - total)))
+            if not rows:
+                break
+            
+            valid_rows = []
+            line_numbers = []
+            for row in rows:
+                total += 1
+                line = total + 1  # 第 1 行為標題
+                data, message = cls.validate_import_row(row, seen_emails)
+                if message:
+                    errors.append({'row': line, 'email': row.get('email', ''), 'message': message})
+                    continue
+                valid_rows.append(data)
+                line_numbers.append(line)
+            
+            inserted, write_errors = cls.bulk_create(valid_rows, rounds=rounds)
+            created += inserted
+            for index, message in write_errors.items():
+                errors.append({'row': line_numbers[index], 'email': valid_rows[index]['email'], 'message': message})
+        
+        if total >= max_rows and next(reader, None) is not None:
+            errors.append({'row': max_rows + 2, 'email': '', 'message': f'單次最多匯入 {max_rows} 筆，其餘資料未處理'})
+        
+        errors.sort(key=lambda error: error['row'])
+        return created, errors
+    
+    def update(self, **kwargs):
+        """更新使用者資料並清除快取"""
+        collection = db.get_collection('users')
+        
+        # 可更新的欄位
+        update_data = {}
+        for field in ['name', 'student_id', 'class_name']:
+            if field in kwargs:
+                update_data[field] = kwargs[field]
+                setattr(self, field, kwargs[field])
+        
+        update_data['updated_at'] = datetime.utcnow()
+        self.updated_at = update_data['updated_at']
+        
+        collection.update_one(
+            {'_id': self._id},
+            {'$set': update_data}
+        )
+        self.invalidate_cache(self._id)
+        return True
+    
+    @staticmethod
+    def invalidate_cache(user_id):
+        """清除使用者資料快取（跨請求快取與目前請求的快取）"""
+        key = str(user_id)
+        profile_cache.delete(key)
+        cache = _request_cache()
+        if cache is not None:
+            cache.pop(key, None)
+    
     def check_password(self, password):
         """檢查密碼是否正確"""
-        return check_password_hash(self.password_hash, password)
+        return hasher.verify(self.password_hash, password)
+    
+    def upgrade_password_hash(self, password):
+        """雜湊格式或成本參數已變更時，以目前設定重新雜湊（需在密碼驗證成功後呼叫）"""
+        if not hasher.needs_rehash(self.password_hash):
+            return False
+        
+        self.password_hash = hasher.hash(password)
+        collection = db.get_collection('users')
+        collection.update_one(
+            {'_id': self._id},
+            {'$set': {'password_hash': self.password_hash}}
+        )
+        return True
     
     @staticmethod
     def validate_email(email):
@@ -63,6 +281,15 @@ class User:
         """驗證密碼強度"""
         return len(password) >= 6
     
+    @classmethod
+    def from_document(cls, user_data):
+        """由 MongoDB 文件建立 User 物件（缺少的欄位使用預設值）"""
+        user = cls.__new__(cls)
+        user._id = user_data['_id']
+        for field, default in FIELD_DEFAULTS.items():
+            setattr(user, field, user_data.get(field, default))
+        return user
+    
     @classmethod
     def find_by_email(cls, email):
         """根據 email 查找使用者"""
@@ -70,44 +297,80 @@ class User:
         user_data = collection.find_one({'email': email})
         
         if user_data:
-            user = cls.__new__(cls)
-            user._id = user_data['_id']
-            user.email = user_data['email']
-            user.password_hash = user_data['password_hash']
-            user.role = user_data['role']
-            user.name = user_data.get('name', '')
-            user.student_id = user_data.get('student_id', '')
-            user.is_active = user_data.get('is_active', True)
-            user.created_at = user_data['created_at']
-            user.updated_at = user_data['updated_at']
-            return user
+            return cls.from_document(user_data)
         return None
     
     @classmethod
-    def find_by_id(cls, user_id):
-        """根據 ID 查找使用者"""
-        collection = db.get_collection('users')
-        try:
-            user_data = collection.find_one({'_id': ObjectId(user_id)})
-        except:
-            return None
-            
-        if user_data:
-            user = cls.__new__(cls)
-            user._id = user_data['_id']
-            user.email = user_data['email']
-            user.password_hash = user_data['password_hash']
-            user.role = user_data['role']
-            user.name = user_data.get('name', '')
-            user.student_id = user_data.get('student_id', '')
-            user.is_active = user_data.get('is_active', True)
-            user.created_at = user_data['created_at']
-            user.updated_at = user_data['updated_at']
-            return user
-        return None
+    def find_by_id(cls, user_id, fields=PROFILE_FIELDS):
+        """根據 ID 查找使用者（預設不取回密碼雜湊，fields=None 取回全部欄位）
+        
+        同一個請求內重複查詢同一位使用者時，直接使用請求範圍快取的結果；
+        不含密碼雜湊的查詢另外經過跨請求的 profile_cache
+        """
+        cache = _request_cache()
+        field_set = frozenset(fields or FIELD_DEFAULTS)
+        key = str(user_id)
+        if cache is not None and key in cache:
+            cached_fields, user = cache[key]
+            if field_set <= cached_fields:
+                return user
+        
+        # 不需要密碼雜湊時，先查跨請求快取；未命中則取回完整個人資料並寫入快取
+        cacheable = field_set <= PROFILE_SET
+        user_data = profile_cache.get(key) if cacheable else None
+        
+        if user_data is None:
+            collection = db.get_collection('users')
+            try:
+                user_data = collection.find_one(
+                    {'_id': ObjectId(user_id)},
+                    projection(PROFILE_FIELDS if cacheable else fields)
+                )
+            except:
+                return None
+            if user_data and cacheable:
+                profile_cache.set(key, user_data)
+        
+        user = cls.from_document(user_data) if user_data else None
+        if cache is not None:
+            cache[key] = (PROFILE_SET if cacheable else field_set, user)
+        return user
     
     @classmethod
-    def email_exists(cls, email):
-        """檢查 email 是否已存在"""
+    def find_summaries_by_ids(cls, user_ids, fields=SUMMARY_FIELDS):
+        """批次查找使用者摘要（預設為 name / email / student_id），回傳 {user_id: 摘要}"""
+        summaries = {}
+        object_ids = set()
+        for user_id in user_ids:
+            # 已在快取中的使用者不需再查詢
+            user_data = profile_cache.get(str(user_id))
+            if user_data is not None:
+                summaries[str(user_id)] = {
+                    field: user_data.get(field, FIELD_DEFAULTS[field]) for field in fields
+                }
+                continue
+            try:
+                object_ids.add(ObjectId(user_id))
+            except Exception:
+                continue
+        
+        if not object_ids:
+            return summaries
+        
+        collection = db.get_collection('users')
+        cursor = collection.find(
+            {'_id': {'$in': list(object_ids)}},
+            projection(fields)
+        )
+        
+        for user_data in cursor:
+            summaries[str(user_data['_id'])] = {
+                field: user_data.get(field, FIELD_DEFAULTS[field]) for field in fields
+            }
+        return summaries
+    
+    @staticmethod
+    def find_ids_by_student_id(student_id):
+        """依學號查找使用者 ID 清單"""
         collection = db.get_collection('users')
-        return collection.find_one({'email': email}) is not None
+        return [user_data['_id'] for user_data in collection.find({'student_id': student_id}, {'_id': 1})]
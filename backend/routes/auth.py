@@ -1,11 +1,17 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, current_user, get_jwt
+from pymongo.errors import DuplicateKeyError
 from models.user import User
-from datetime import timedelta
+from utils.identity import blocklist, token_claims
+from utils.rate_limit import (
+    rate_limited, client_ip, request_email,
+    LOGIN_RATE_LIMIT_IP, LOGIN_RATE_LIMIT_EMAIL, REGISTER_RATE_LIMIT_IP
+)
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limited(('register_ip', client_ip, REGISTER_RATE_LIMIT_IP))
 def register():
     """使用者註冊"""
     try:
@@ -26,20 +32,20 @@ def register():
         if not User.validate_password(password):
             return jsonify({'message': '密碼長度至少 6 碼'}), 400
         
-        # 檢查 email 是否已存在
-        if User.email_exists(email):
-            return jsonify({'message': '此 Email 已被註冊'}), 409
-        
-        # 建立新使用者
+        # 建立新使用者（直接寫入，Email 重複由唯一索引判斷）
         user = User(
             email=email,
             password=password,
             role=data.get('role', 'student'),
             name=data.get('name', ''),
-            student_id=data.get('student_id', '')
+            student_id=data.get('student_id', ''),
+            class_name=data.get('class_name', '')
         )
         
-        user_id = user.save()
+        try:
+            user_id = user.save()
+        except DuplicateKeyError:
+            return jsonify({'message': '此 Email 已被註冊'}), 409
         
         return jsonify({
             'message': '註冊成功',
@@ -51,6 +57,10 @@ def register():
         return jsonify({'message': f'註冊失敗: {str(e)}'}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limited(
+    ('login_ip', client_ip, LOGIN_RATE_LIMIT_IP),
+    ('login_email', request_email, LOGIN_RATE_LIMIT_EMAIL)
+)
 def login():
     """使用者登入"""
     try:
@@ -76,10 +86,13 @@ def login():
         if not user.is_active:
             return jsonify({'message': '帳號已被停用'}), 401
         
-        # 建立 JWT token
+        # 舊格式或成本參數變更的密碼雜湊，登入成功時自動升級
+        user.upgrade_password_hash(password)
+        
+        # 建立 JWT token（帶入角色宣告，權限檢查不需再查詢資料庫）
         access_token = create_access_token(
             identity=str(user._id),
-            expires_delta=timedelta(seconds=int(3600))
+            additional_claims=token_claims(user)
         )
         
         return jsonify({
@@ -96,14 +109,11 @@ def login():
 def get_current_user():
     """取得目前登入使用者資訊"""
     try:
-        user_id = get_jwt_identity()
-        user = User.find_by_id(user_id)
-        
-        if not user:
+        if not current_user:
             return jsonify({'message': '使用者不存在'}), 404
         
         return jsonify({
-            'user': user.to_dict()
+            'user': current_user.to_dict()
         }), 200
         
     except Exception as e:
@@ -113,6 +123,6 @@ def get_current_user():
 @jwt_required()
 def logout():
     """使用者登出"""
-    # 注意：JWT 是無狀態的，真正的登出需要在前端刪除 token
-    # 或者實作 token 黑名單機制
+    # 將目前的 token 加入黑名單；前端仍需刪除本地保存的 token
+    blocklist.revoke(get_jwt())
     return jsonify({'message': '登出成功'}), 200
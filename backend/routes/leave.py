@@ -1,8 +1,39 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.leave_request import LeaveRequest
-from models.user import User
-from datetime import datetime
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
+from models.leave_request import LeaveRequest, PENDING_LIST_FIELDS, OVERLAP_FIELDS
+from models.leave_summary import LeaveSummary, leave_days
+from models.user import User, SUMMARY_FIELDS
+from utils.identity import role_required
+from utils.pagination import get_page_size, decode_cursor, split_page
+from utils.etag import compute_etag, not_modified, with_etag
+from utils.mongo import LockNotAcquired
+from utils.export import EXPORT_BATCH_SIZE, batched, stream_csv, stream_xlsx, xlsx_available
+from bson import ObjectId
+from datetime import datetime, timedelta, timezone
+
+# 批次審核單次最多筆數
+MAX_BULK_REVIEW = 500
+
+# 統計報表列出的學生數上限
+MAX_STATS_STUDENTS = 200
+
+# 請假類型
+LEAVE_TYPES = [
+    {'id': 'sick', 'name': '病假', 'description': '因生病需要請假'},
+    {'id': 'personal', 'name': '事假', 'description': '因私人事務需要請假'},
+    {'id': 'family', 'name': '家事假', 'description': '因家庭事務需要請假'},
+    {'id': 'funeral', 'name': '喪假', 'description': '因家屬過世需要請假'},
+    {'id': 'maternity', 'name': '產假', 'description': '因生產需要請假'},
+    {'id': 'emergency', 'name': '緊急假', 'description': '因緊急事件需要請假'}
+]
+
+STATUS_NAMES = {'pending': '待審核', 'approved': '已核准', 'rejected': '已拒絕'}
+
+# 匯出欄位
+EXPORT_HEADERS = [
+    '申請編號', '學號', '姓名', '班級', 'Email', '假別', '開始日期', '結束日期', '天數',
+    '原因', '狀態', '審核時間', '教師備註', '拒絕原因', '申請時間'
+]
 
 leave_bp = Blueprint('leave', __name__)
 
@@ -10,17 +41,8 @@ leave_bp = Blueprint('leave', __name__)
 @jwt_required()
 def get_leave_types():
     """取得請假類型清單"""
-    leave_types = [
-        {'id': 'sick', 'name': '病假', 'description': '因生病需要請假'},
-        {'id': 'personal', 'name': '事假', 'description': '因私人事務需要請假'},
-        {'id': 'family', 'name': '家事假', 'description': '因家庭事務需要請假'},
-        {'id': 'funeral', 'name': '喪假', 'description': '因家屬過世需要請假'},
-        {'id': 'maternity', 'name': '產假', 'description': '因生產需要請假'},
-        {'id': 'emergency', 'name': '緊急假', 'description': '因緊急事件需要請假'}
-    ]
-    
     return jsonify({
-        'leave_types': leave_types
+        'leave_types': LEAVE_TYPES
     }), 200
 
 @leave_bp.route('/apply', methods=['POST'])
@@ -62,7 +84,17 @@ def apply_leave():
             emergency_contact=data.get('emergency_contact', '')
         )
         
-        request_id = leave_request.save()
+        # 與自己待審核或已核准的申請日期重疊時不建立
+        try:
+            overlaps = leave_request.save_without_overlap()
+        except LockNotAcquired:
+            return jsonify({'message': '申請處理中，請稍後再試'}), 409
+        if overlaps:
+            return jsonify({
+                'message': '請假期間與已申請的假重疊',
+                'overlaps': [LeaveRequest.document_to_dict(req, OVERLAP_FIELDS) for req in overlaps]
+            }), 409
+        request_id = str(leave_request._id)
         
         return jsonify({
             'message': '請假申請提交成功',
@@ -80,71 +112,342 @@ def get_my_requests():
     try:
         user_id = get_jwt_identity()
         
-        # 取得查詢參數
+        # 取得查詢參數（limit 為舊參數名稱，等同 page_size）
         status = request.args.get('status')  # pending, approved, rejected
-        limit = request.args.get('limit', type=int)
+        page_size = get_page_size(
+            request.args.get('page_size', type=int) or request.args.get('limit', type=int)
+        )
         
-        # 查找請假申請
-        requests = LeaveRequest.find_by_user_id(user_id, limit=limit, status=status)
+        after = None
+        if request.args.get('cursor'):
+            try:
+                after = decode_cursor(request.args['cursor'])
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+        
+        # 記錄未變更時直接回傳 304，不查詢清單內容
+        etag = compute_etag(
+            user_id, request.full_path, LeaveRequest.user_list_version(user_id)
+        )
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        # 查找請假申請（多取一筆判斷是否還有下一頁）
+        requests = LeaveRequest.find_by_user_id(
+            user_id, limit=page_size + 1, status=status, after=after, lean=True
+        )
+        requests, next_cursor = split_page(requests, page_size)
         
         # 轉換為字典格式
-        requests_data = [req.to_dict() for req in requests]
+        requests_data = [LeaveRequest.document_to_dict(req) for req in requests]
         
-        return jsonify({
+        return with_etag(jsonify({
             'requests': requests_data,
-            'total': len(requests_data)
-        }), 200
+            'total': len(requests_data),
+            'next_cursor': next_cursor
+        }), etag), 200
         
     except Exception as e:
         return jsonify({'message': f'取得請假記錄失敗: {str(e)}'}), 500
 
 @leave_bp.route('/pending', methods=['GET'])
-@jwt_required()
+@role_required('teacher', 'admin', message='沒有權限查看待審核申請')
 def get_pending_requests():
     """獲取待審核申請 (僅限老師和管理員)"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.find_by_id(current_user_id)
+        page_size = get_page_size(request.args.get('page_size', type=int))
+        
+        after = None
+        if request.args.get('cursor'):
+            try:
+                after = decode_cursor(request.args['cursor'])
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+        
+        # 待審核清單未變更時直接回傳 304，不查詢清單內容與申請人資訊
+        etag = compute_etag(request.full_path, LeaveRequest.pending_list_version())
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        # 獲取待審核申請（多取一筆判斷是否還有下一頁）
+        requests = LeaveRequest.find_all_pending(
+            limit=page_size + 1, after=after, fields=PENDING_LIST_FIELDS, lean=True
+        )
+        requests, next_cursor = split_page(requests, page_size)
         
-        if not user:
-            return jsonify({'message': '使用者不存在'}), 404
-            
-        # 檢查權限 - 僅老師和管理員可以查看
-        if user.role not in ['teacher', 'admin']:
-            return jsonify({'message': '沒有權限查看待審核申請'}), 403
-            
-        # 獲取所有待審核申請
-        requests = LeaveRequest.find_all_pending()
+        # 一次查詢取得所有申請人資訊，避免每筆申請各查一次
+        applicants = User.find_summaries_by_ids({req['user_id'] for req in requests})
         
         # 轉換為JSON格式並加入申請人資訊
         requests_data = []
-        for request in requests:
-            request_dict = request.to_dict()
-            # 添加申請人資訊
-            applicant = User.find_by_id(request.user_id)
+        for req in requests:
+            request_dict = LeaveRequest.document_to_dict(req, PENDING_LIST_FIELDS)
+            applicant = applicants.get(str(req['user_id']))
             if applicant:
-                request_dict['applicant'] = {
-                    'name': applicant.name,
-                    'email': applicant.email,
-                    'student_id': applicant.student_id
-                }
+                request_dict['applicant'] = applicant
             requests_data.append(request_dict)
             
-        return jsonify({
+        return with_etag(jsonify({
             'message': '獲取待審核申請成功',
-            'requests': requests_data
-        }), 200
+            'requests': requests_data,
+            'next_cursor': next_cursor
+        }), etag), 200
         
     except Exception as e:
         return jsonify({'message': f'獲取待審核申請失敗: {str(e)}'}), 500
 
+@leave_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_requests():
+    """搜尋請假申請，學生只能搜尋自己的申請
+    
+    查詢參數: q（請假原因關鍵字）、from / to（與請假期間重疊的日期範圍，YYYY-MM-DD，含首尾）、
+    leave_type、status、student_id、reviewer_id（審核人）、page_size、cursor
+    """
+    try:
+        if not current_user:
+            return jsonify({'message': '使用者不存在'}), 404
+        
+        page_size = get_page_size(request.args.get('page_size', type=int))
+        
+        after = None
+        if request.args.get('cursor'):
+            try:
+                after = decode_cursor(request.args['cursor'])
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+        
+        try:
+            date_from = datetime.fromisoformat(request.args['from']) if request.args.get('from') else None
+            date_to = datetime.fromisoformat(request.args['to']) + timedelta(days=1) if request.args.get('to') else None
+        except ValueError:
+            return jsonify({'message': '日期格式錯誤，請使用 YYYY-MM-DD'}), 400
+        
+        status = request.args.get('status')
+        if status and status not in STATUS_NAMES:
+            return jsonify({'message': '無效的申請狀態'}), 400
+        
+        # 老師和管理員可依學號搜尋，學生只搜尋自己的申請
+        is_reviewer = current_user.role in ['teacher', 'admin']
+        user_ids = None
+        if not is_reviewer:
+            user_ids = [ObjectId(get_jwt_identity())]
+        elif request.args.get('student_id'):
+            user_ids = User.find_ids_by_student_id(request.args['student_id'])
+        
+        query = LeaveRequest.search_query(
+            text=request.args.get('q'),
+            date_from=date_from,
+            date_to=date_to,
+            leave_type=request.args.get('leave_type'),
+            status=status,
+            user_ids=user_ids,
+            reviewer_id=request.args.get('reviewer_id')
+        )
+        requests = LeaveRequest.search(query, limit=page_size + 1, after=after)
+        requests, next_cursor = split_page(requests, page_size)
+        
+        applicants = {}
+        if is_reviewer:
+            applicants = User.find_summaries_by_ids({req['user_id'] for req in requests})
+        
+        requests_data = []
+        for req in requests:
+            request_dict = LeaveRequest.document_to_dict(req)
+            applicant = applicants.get(str(req['user_id']))
+            if applicant:
+                request_dict['applicant'] = applicant
+            requests_data.append(request_dict)
+        
+        return jsonify({
+            'requests': requests_data,
+            'total': len(requests_data),
+            'next_cursor': next_cursor
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'message': f'搜尋請假申請失敗: {str(e)}'}), 500
+
+def reviewed_counts():
+    """今日 / 本週（週一起算）審核數，日期界線依 SCHOOL_TIMEZONE 計算後換算為 UTC 查詢"""
+    now = datetime.now(current_app.config['SCHOOL_TIMEZONE'])
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = today - timedelta(days=today.weekday())
+    
+    def to_utc(value):
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    return {
+        'today': LeaveRequest.count_reviewed_since(to_utc(today)),
+        'this_week': LeaveRequest.count_reviewed_since(to_utc(week_start))
+    }
+
+@leave_bp.route('/stats', methods=['GET'])
+@role_required('teacher', 'admin', message='沒有權限查看請假統計')
+def get_leave_stats():
+    """請假統計報表 (僅限老師和管理員)
+    
+    查詢參數: from / to（請假開始日期範圍，YYYY-MM-DD，含首尾）、status、students（列出學生數）
+    """
+    try:
+        try:
+            start = datetime.fromisoformat(request.args['from']) if request.args.get('from') else None
+            end = datetime.fromisoformat(request.args['to']) + timedelta(days=1) if request.args.get('to') else None
+        except ValueError:
+            return jsonify({'message': '日期格式錯誤，請使用 YYYY-MM-DD'}), 400
+        
+        status = request.args.get('status')
+        if status and status not in ('pending', 'approved', 'rejected'):
+            return jsonify({'message': '無效的申請狀態'}), 400
+        
+        top_students = min(max(request.args.get('students', 50, type=int), 1), MAX_STATS_STUDENTS)
+        stats = LeaveRequest.statistics(start=start, end=end, status=status, top_students=top_students)
+        
+        stats['reviewed'] = reviewed_counts()
+        
+        return jsonify({
+            'message': '取得請假統計成功',
+            'stats': stats
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'message': f'取得請假統計失敗: {str(e)}'}), 500
+
+@leave_bp.route('/stats/reviewed', methods=['GET'])
+@role_required('teacher', 'admin', message='沒有權限查看請假統計')
+def get_reviewed_counts():
+    """今日 / 本週審核數 (僅限老師和管理員)，只有兩次索引計數，供審核頁面的統計卡片使用"""
+    try:
+        return jsonify({
+            'message': '取得審核數成功',
+            'reviewed': reviewed_counts()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'message': f'取得審核數失敗: {str(e)}'}), 500
+
+@leave_bp.route('/summary', methods=['GET'])
+@jwt_required()
+def get_leave_summary():
+    """取得學生某學期的請假彙總（依狀態、假別的筆數與天數）
+    
+    查詢參數: term（例如 2025-1，預設為本學期）、user_id（僅老師和管理員可查詢其他學生）
+    """
+    try:
+        user_id = request.args.get('user_id') or get_jwt_identity()
+        if user_id != get_jwt_identity():
+            if not current_user:
+                return jsonify({'message': '使用者不存在'}), 404
+            if current_user.role not in ['teacher', 'admin']:
+                return jsonify({'message': '無權限查看其他學生的請假彙總'}), 403
+            if not ObjectId.is_valid(user_id):
+                return jsonify({'message': '無效的使用者編號'}), 400
+        
+        return jsonify({
+            'summary': LeaveSummary.find(user_id, request.args.get('term'))
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'message': f'取得請假彙總失敗: {str(e)}'}), 500
+
+def export_rows(cursor):
+    """逐批將請假申請轉換為匯出資料列，每批以一次查詢取得申請人資訊"""
+    type_names = {leave_type['id']: leave_type['name'] for leave_type in LEAVE_TYPES}
+    
+    def format_datetime(value, date_only=False):
+        if not isinstance(value, datetime):
+            return ''
+        return value.strftime('%Y-%m-%d' if date_only else '%Y-%m-%d %H:%M')
+    
+    for documents in batched(cursor, EXPORT_BATCH_SIZE):
+        applicants = User.find_summaries_by_ids(
+            {document['user_id'] for document in documents},
+            fields=SUMMARY_FIELDS + ('class_name',)
+        )
+        rows = []
+        for document in documents:
+            applicant = applicants.get(str(document['user_id']), {})
+            start_date, end_date = document.get('start_date'), document.get('end_date')
+            rows.append([
+                str(document['_id']),
+                applicant.get('student_id', ''),
+                applicant.get('name', ''),
+                applicant.get('class_name', ''),
+                applicant.get('email', ''),
+                type_names.get(document.get('leave_type'), document.get('leave_type', '')),
+                format_datetime(start_date, date_only=True),
+                format_datetime(end_date, date_only=True),
+                leave_days(start_date, end_date) if start_date and end_date else '',
+                document.get('reason', ''),
+                STATUS_NAMES.get(document.get('status'), document.get('status', '')),
+                format_datetime(document.get('approved_at')),
+                document.get('teacher_note', ''),
+                document.get('rejected_reason', ''),
+                format_datetime(document.get('created_at'))
+            ])
+        yield rows
+
+@leave_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_requests():
+    """匯出請假記錄（CSV / XLSX），學生只能匯出自己的記錄
+    
+    查詢參數: format（csv / xlsx）、from / to（請假開始日期，YYYY-MM-DD，含首尾）、status、leave_type
+    資料以資料庫 cursor 逐批讀取並以串流回應輸出，記憶體用量不隨筆數增加
+    """
+    try:
+        if not current_user:
+            return jsonify({'message': '使用者不存在'}), 404
+        
+        export_format = request.args.get('format', 'csv')
+        if export_format not in ('csv', 'xlsx'):
+            return jsonify({'message': '匯出格式必須為 csv 或 xlsx'}), 400
+        if export_format == 'xlsx' and not xlsx_available():
+            return jsonify({'message': '匯出 XLSX 需要安裝 openpyxl 套件'}), 501
+        
+        try:
+            start = datetime.fromisoformat(request.args['from']) if request.args.get('from') else None
+            end = datetime.fromisoformat(request.args['to']) + timedelta(days=1) if request.args.get('to') else None
+        except ValueError:
+            return jsonify({'message': '日期格式錯誤，請使用 YYYY-MM-DD'}), 400
+        
+        status = request.args.get('status')
+        if status and status not in STATUS_NAMES:
+            return jsonify({'message': '無效的申請狀態'}), 400
+        
+        # 老師和管理員匯出全部學生，學生只匯出自己的記錄
+        user_id = None if current_user.role in ['teacher', 'admin'] else get_jwt_identity()
+        
+        cursor = LeaveRequest.iter_export(
+            start=start, end=end, status=status, leave_type=request.args.get('leave_type'),
+            user_id=user_id, batch_size=EXPORT_BATCH_SIZE
+        )
+        filename = f"leave_requests_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+        
+        if export_format == 'xlsx':
+            body = stream_xlsx(EXPORT_HEADERS, export_rows(cursor), title='請假記錄')
+            mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        else:
+            body = stream_csv(EXPORT_HEADERS, export_rows(cursor))
+            mimetype = 'text/csv'
+        
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+        
+    except Exception as e:
+        return jsonify({'message': f'匯出請假記錄失敗: {str(e)}'}), 500
+
 @leave_bp.route('/request/<request_id>', methods=['GET'])
 @jwt_required()
 def get_request_detail(request_id):
     """取得請假申請詳細資訊"""
     try:
         user_id = get_jwt_identity()
-        current_user = User.find_by_id(user_id)
+        if not current_user:
+            return jsonify({'message': '使用者不存在'}), 404
         
         # 查找請假申請
         leave_request = LeaveRequest.find_by_id(request_id)
@@ -155,10 +458,17 @@ def get_request_detail(request_id):
         if str(leave_request.user_id) != user_id and current_user.role not in ['teacher', 'admin']:
             return jsonify({'message': '無權限查看此請假申請'}), 403
         
+        # 申請未更新時直接回傳 304（老師與管理員看到的內容另含申請人資訊）
+        is_reviewer = current_user.role in ['teacher', 'admin']
+        etag = compute_etag(request_id, leave_request.updated_at, is_reviewer)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
         # 如果是管理員查看，加入申請人資訊
         request_data = leave_request.to_dict()
-        if current_user.role in ['teacher', 'admin']:
-            applicant = User.find_by_id(str(leave_request.user_id))
+        if is_reviewer:
+            applicant = User.find_by_id(leave_request.user_id, fields=SUMMARY_FIELDS)
             if applicant:
                 request_data['applicant'] = {
                     'name': applicant.name,
@@ -166,43 +476,38 @@ def get_request_detail(request_id):
                     'student_id': applicant.student_id
                 }
         
-        return jsonify({
+        return with_etag(jsonify({
             'request': request_data
-        }), 200
+        }), etag), 200
         
     except Exception as e:
         return jsonify({'message': f'取得請假申請詳情失敗: {str(e)}'}), 500
 
+def review_failed_response(request_id):
+    """條件更新未成功時，區分申請不存在與已被處理"""
+    if not LeaveRequest.find_by_id(request_id, fields=('status',)):
+        return jsonify({'message': '請假申請不存在'}), 404
+    return jsonify({'message': '此請假申請已被處理'}), 400
+
 @leave_bp.route('/approve/<request_id>', methods=['POST'])
-@jwt_required()
+@role_required('teacher', 'admin', message='無權限審核請假申請')
 def approve_request(request_id):
     """核准請假申請（僅老師和管理員）"""
     try:
         user_id = get_jwt_identity()
-        current_user = User.find_by_id(user_id)
-        
-        # 檢查權限
-        if current_user.role not in ['teacher', 'admin']:
-            return jsonify({'message': '無權限審核請假申請'}), 403
-        
-        # 查找請假申請
-        leave_request = LeaveRequest.find_by_id(request_id)
-        if not leave_request:
-            return jsonify({'message': '請假申請不存在'}), 404
-        
-        if leave_request.status != 'pending':
-            return jsonify({'message': '此請假申請已被處理'}), 400
         
         data = request.get_json() or {}
         teacher_note = data.get('teacher_note', '')
         
-        # 更新申請狀態
-        leave_request.update(
-            status='approved',
-            approved_by=user_id,
-            approved_at=datetime.utcnow(),
+        # 僅在申請仍為待審核時更新狀態
+        leave_request = LeaveRequest.review(
+            request_id,
+            'approved',
+            user_id,
             teacher_note=teacher_note
         )
+        if not leave_request:
+            return review_failed_response(request_id)
         
         return jsonify({
             'message': '請假申請已核准',
@@ -213,24 +518,11 @@ def approve_request(request_id):
         return jsonify({'message': f'核准請假申請失敗: {str(e)}'}), 500
 
 @leave_bp.route('/reject/<request_id>', methods=['POST'])
-@jwt_required()
+@role_required('teacher', 'admin', message='無權限審核請假申請')
 def reject_request(request_id):
     """拒絕請假申請（僅老師和管理員）"""
     try:
         user_id = get_jwt_identity()
-        current_user = User.find_by_id(user_id)
-        
-        # 檢查權限
-        if current_user.role not in ['teacher', 'admin']:
-            return jsonify({'message': '無權限審核請假申請'}), 403
-        
-        # 查找請假申請
-        leave_request = LeaveRequest.find_by_id(request_id)
-        if not leave_request:
-            return jsonify({'message': '請假申請不存在'}), 404
-        
-        if leave_request.status != 'pending':
-            return jsonify({'message': '此請假申請已被處理'}), 400
         
         data = request.get_json() or {}
         rejected_reason = data.get('rejected_reason', '')
@@ -239,14 +531,16 @@ def reject_request(request_id):
         if not rejected_reason:
             return jsonify({'message': '請提供拒絕原因'}), 400
         
-        # 更新申請狀態
-        leave_request.update(
-            status='rejected',
-            approved_by=user_id,
-            approved_at=datetime.utcnow(),
-            rejected_reason=rejected_reason,
-            teacher_note=teacher_note
+        # 僅在申請仍為待審核時更新狀態
+        leave_request = LeaveRequest.review(
+            request_id,
+            'rejected',
+            user_id,
+            teacher_note=teacher_note,
+            rejected_reason=rejected_reason
         )
+        if not leave_request:
+            return review_failed_response(request_id)
         
         return jsonify({
             'message': '請假申請已拒絕',
@@ -255,3 +549,79 @@ def reject_request(request_id):
         
     except Exception as e:
         return jsonify({'message': f'拒絕請假申請失敗: {str(e)}'}), 500
+
+@leave_bp.route('/bulk-review', methods=['POST'])
+@role_required('teacher', 'admin', message='無權限審核請假申請')
+def bulk_review():
+    """批次核准 / 拒絕請假申請（僅老師和管理員）"""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json() or {}
+        items = data.get('reviews')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'message': '請提供審核清單'}), 400
+        if len(items) > MAX_BULK_REVIEW:
+            return jsonify({'message': f'單次最多審核 {MAX_BULK_REVIEW} 筆'}), 400
+        
+        # 逐筆驗證，格式錯誤的項目直接回報，不送往資料庫
+        results = []
+        reviews = []
+        seen = set()
+        for item in items:
+            item = item if isinstance(item, dict) else {}
+            request_id = str(item.get('id', ''))
+            decision = item.get('decision')
+            result = {'id': request_id, 'success': False}
+            results.append(result)
+            
+            if not ObjectId.is_valid(request_id):
+                result['message'] = '無效的申請編號'
+                continue
+            if request_id in seen:
+                result['message'] = '重複的申請編號'
+                continue
+            if decision not in ('approve', 'reject'):
+                result['message'] = '審核結果必須為 approve 或 reject'
+                continue
+            if decision == 'reject' and not item.get('rejected_reason'):
+                result['message'] = '請提供拒絕原因'
+                continue
+            
+            seen.add(request_id)
+            result['status'] = 'approved' if decision == 'approve' else 'rejected'
+            reviews.append({
+                '_id': ObjectId(request_id),
+                'status': result['status'],
+                'teacher_note': item.get('teacher_note', ''),
+                'rejected_reason': item.get('rejected_reason', '') if decision == 'reject' else ''
+            })
+        
+        outcomes = LeaveRequest.bulk_review(reviews, user_id)
+        
+        messages = {
+            'processed': '此請假申請已被處理',
+            'not_found': '請假申請不存在',
+            'failed': '審核失敗，請稍後再試'
+        }
+        for result in results:
+            if 'status' not in result:
+                continue
+            outcome = outcomes[ObjectId(result['id'])]
+            if outcome == 'reviewed':
+                result['success'] = True
+            else:
+                result['message'] = messages[outcome]
+                del result['status']
+        
+        succeeded = [result for result in results if result['success']]
+        return jsonify({
+            'message': '批次審核完成',
+            'results': results,
+            'approved': sum(1 for result in succeeded if result['status'] == 'approved'),
+            'rejected': sum(1 for result in succeeded if result['status'] == 'rejected'),
+            'failed': len(results) - len(succeeded)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'message': f'批次審核失敗: {str(e)}'}), 500
@@ -1,6 +1,10 @@
+import csv
+import io
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.user import User
+from flask_jwt_extended import jwt_required, current_user
+from werkzeug.exceptions import RequestEntityTooLarge
+from models.user import User, MAX_IMPORT_ROWS
+from utils.identity import resolve_current_user, role_required
 
 users_bp = Blueprint('users', __name__)
 
@@ -22,14 +26,11 @@ def login():
 def get_profile():
     """取得使用者個人資料"""
     try:
-        user_id = get_jwt_identity()
-        user = User.find_by_id(user_id)
-        
-        if not user:
+        if not current_user:
             return jsonify({'message': '使用者不存在'}), 404
         
         return jsonify({
-            'user': user.to_dict()
+            'user': current_user.to_dict()
         }), 200
         
     except Exception as e:
@@ -40,35 +41,14 @@ def get_profile():
 def update_profile():
     """更新使用者個人資料"""
     try:
-        user_id = get_jwt_identity()
-        user = User.find_by_id(user_id)
-        
-        if not user:
+        user = resolve_current_user()
+        if user is None:
             return jsonify({'message': '使用者不存在'}), 404
         
         data = request.get_json()
         
-        # 可更新的欄位
-        if 'name' in data:
-            user.name = data['name']
-        if 'student_id' in data:
-            user.student_id = data['student_id']
-        
-        # 更新時間
-        from datetime import datetime
-        user.updated_at = datetime.utcnow()
-        
-        # 儲存到資料庫
-        from config.database import db
-        collection = db.get_collection('users')
-        collection.update_one(
-            {'_id': user._id},
-            {'$set': {
-                'name': user.name,
-                'student_id': user.student_id,
-                'updated_at': user.updated_at
-            }}
-        )
+        # 儲存到資料庫（同時清除使用者快取）
+        user.update(**{field: data[field] for field in ['name', 'student_id', 'class_name'] if field in data})
         
         return jsonify({
             'message': '個人資料更新成功',
@@ -77,3 +57,63 @@ def update_profile():
         
     except Exception as e:
         return jsonify({'message': f'更新個人資料失敗: {str(e)}'}), 500
+
+def read_import_lines(text_stream):
+    """逐行讀取上傳的 CSV，超過 MAX_IMPORT_ROWS 筆資料時立即停止並回傳 None
+    
+    在計算密碼雜湊前檢查筆數；記憶體中最多保留 MAX_IMPORT_ROWS 筆（第 1 行為標題，空白行不計）
+    """
+    lines = []
+    
+    def recorded():
+        for line in text_stream:
+            lines.append(line)
+            yield line
+    
+    rows = 0
+    for row in csv.reader(recorded()):
+        if row:
+            rows += 1
+            if rows > MAX_IMPORT_ROWS + 1:
+                return None
+    return lines
+
+@users_bp.route('/import', methods=['POST'])
+@role_required('admin', message='只有管理員可以匯入帳號')
+def import_users():
+    """以 CSV 批次建立帳號（僅限管理員）
+    
+    CSV 欄位: email, password, name, student_id, class_name, role（預設 student）。
+    可用 multipart 上傳（欄位名稱 file）或直接以 text/csv 作為請求內容。
+    超過 MAX_IMPORT_ROWS 筆時整份拒絕（413），不做部分匯入；
+    大量帳號改用 flask --app app import-users <檔案>，不受 HTTP 逾時限制
+    """
+    try:
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        lines = read_import_lines(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+        if lines is None:
+            return jsonify({
+                'message': f'單次最多匯入 {MAX_IMPORT_ROWS} 筆，'
+                           f'更多帳號請由管理員執行 flask --app app import-users 匯入'
+            }), 413
+        
+        created, errors = User.import_csv(lines)
+        
+        return jsonify({
+            'message': '匯入完成',
+            'created': created,
+            'failed': len(errors),
+            'errors': errors
+        }), 200
+        
+    except RequestEntityTooLarge:
+        return jsonify({'message': '檔案過大，更多帳號請由管理員執行 flask --app app import-users 匯入'}), 413
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except csv.Error as e:
+        return jsonify({'message': f'CSV 格式錯誤: {e}'}), 400
+    except UnicodeDecodeError:
+        return jsonify({'message': 'CSV 檔案必須為 UTF-8 編碼'}), 400
+    except Exception as e:
+        return jsonify({'message': f'匯入帳號失敗: {str(e)}'}), 500
@@ -0,0 +1,155 @@
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+import bson
+
+class CacheBackend(ABC):
+    """快取後端介面
+
+    值為 MongoDB 文件（dict）。本機實作直接保存物件，
+    共用實作（例如 Redis）需自行序列化，讓多個 worker 共用同一份快取。
+    未實作全部方法的子類別在建立時即拋出 TypeError。
+    """
+
+    @abstractmethod
+    def get(self, key):
+        """取得快取值，不存在或已過期時回傳 None"""
+
+    @abstractmethod
+    def set(self, key, value):
+        """寫入快取值"""
+
+    @abstractmethod
+    def delete(self, key):
+        """刪除快取值"""
+
+    @abstractmethod
+    def clear(self):
+        """清除全部快取"""
+
+    def stats(self):
+        """回傳命中統計"""
+        return {}
+
+class NullCache(CacheBackend):
+    """停用快取時使用，所有查詢皆未命中"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+class LRUCache(CacheBackend):
+    """行程內有容量上限與存活時間的 LRU 快取（執行緒安全）"""
+
+    def __init__(self, maxsize=10000, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (到期時間, 值)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+class RedisCache(CacheBackend):
+    """以 Redis 儲存的共用快取（需安裝 redis 套件），文件以 BSON 序列化"""
+
+    def __init__(self, url, ttl=30, namespace='cache'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('使用 Redis 快取需要安裝 redis 套件')
+
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key):
+        return f'{self.namespace}:{key}'
+
+    def get(self, key):
+        raw = self._client.get(self._key(key))
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return bson.decode(raw)
+
+    def set(self, key, value):
+        self._client.setex(self._key(key), self.ttl, bson.encode(value))
+
+    def delete(self, key):
+        self._client.delete(self._key(key))
+
+    def clear(self):
+        keys = list(self._client.scan_iter(match=self._key('*')))
+        if keys:
+            self._client.delete(*keys)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+def create_cache(backend, maxsize=10000, ttl=30, url=None, namespace='cache'):
+    """依設定建立快取後端：memory、redis 或 none"""
+    if backend == 'none':
+        return NullCache()
+    if backend == 'redis':
+        return RedisCache(url, ttl=ttl, namespace=namespace)
+    if backend == 'memory':
+        return LRUCache(maxsize=maxsize, ttl=ttl)
+    raise ValueError(f'不支援的快取後端: {backend}')
@@ -0,0 +1,52 @@
+import gzip
+import os
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # 未安裝時只提供 gzip
+    brotli = None
+
+# 回應超過此大小（bytes）才壓縮，小回應壓縮的效益低於 CPU 成本
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/csv', 'text/plain', 'text/html')
+
+def compress(data, encoding):
+    """以指定編碼壓縮回應內容"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL)
+
+def choose_encoding(accept_encoding):
+    """依 Accept-Encoding 選擇壓縮方式：取 q 值最高者，相同時優先使用 brotli；q=0 表示拒絕該編碼"""
+    encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return accept_encoding.best_match(encodings)
+
+def init_compression(app):
+    """註冊回應壓縮（COMPRESS_ENABLED=false 時停用，例如已由 nginx 壓縮）"""
+    if os.getenv('COMPRESS_ENABLED', 'true').lower() not in ('true', '1'):
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code >= 300
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,44 @@
+import os
+import re
+import uuid
+from flask import request
+from config.database import RequestCommandStats, current_command_stats
+
+# 接受用戶端（或 nginx）提供的請求 ID，格式不符時改為自行產生
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+def request_id():
+    """目前請求的 ID：沿用 X-Request-ID，沒有時產生新的"""
+    incoming = request.headers.get('X-Request-ID', '')
+    if _REQUEST_ID.match(incoming):
+        return incoming
+    return uuid.uuid4().hex[:16]
+
+def init_db_monitoring(app):
+    """每個請求統計資料庫指令次數與耗時，並加入回應標頭
+
+    X-DB-Calls 為指令次數（包含 getMore），Server-Timing 的 db 項目為總耗時，
+    可在瀏覽器開發者工具中直接看到，用來發現 N+1 查詢；X-Request-ID 對應慢查詢日誌。
+    MONGODB_COMMAND_MONITORING=false 時停用（指令監控未註冊，無法統計）
+    """
+    if os.getenv('MONGODB_COMMAND_MONITORING', 'true').lower() not in ('true', '1'):
+        return
+
+    @app.before_request
+    def start_command_stats():
+        current_command_stats.set(RequestCommandStats(request_id(), request.endpoint or '-'))
+
+    # 串流回應（例如匯出）在送出標頭後讀取的資料不會計入
+    @app.after_request
+    def add_command_headers(response):
+        stats = current_command_stats.get()
+        if stats is not None:
+            response.headers['X-Request-ID'] = stats.request_id
+            response.headers['X-DB-Calls'] = str(stats.calls)
+            response.headers.add('Server-Timing', f'db;dur={stats.duration_ms:.1f};desc="{stats.calls} calls"')
+        return response
+
+    # gthread 的執行緒會重複處理請求，結束時清除，避免請求以外的指令計入上一個請求
+    @app.teardown_request
+    def clear_command_stats(exc):
+        current_command_stats.set(None)
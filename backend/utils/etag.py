@@ -0,0 +1,23 @@
+import hashlib
+from flask import request, make_response
+
+def compute_etag(*parts):
+    """由版本資訊（使用者、查詢參數、筆數、最後更新時間等）計算 ETag"""
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return digest[:32]
+
+def not_modified(etag):
+    """用戶端帶的 If-None-Match 與目前版本相同時回傳 304 回應，否則回傳 None
+
+    在查詢清單內容與序列化之前呼叫，未變更時可省下兩者的成本
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+        return with_etag(response, etag)
+    return None
+
+def with_etag(response, etag):
+    """加上 ETag 與快取標頭（僅限使用者自己的瀏覽器快取，每次使用前需向伺服器確認）"""
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,67 @@
+import csv
+import io
+import os
+import tempfile
+from itertools import islice
+
+# 匯出時每批從資料庫讀取的筆數（同時也是批次查詢申請人資訊的筆數）
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 500))
+
+# XLSX 檔案組合完成後，每次傳送的大小
+XLSX_CHUNK_SIZE = 64 * 1024
+
+def batched(iterable, size):
+    """將 iterable 依 size 分批"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def stream_csv(headers, row_batches):
+    """以產生器逐批輸出 CSV（UTF-8 BOM，Excel 開啟中文不會亂碼）"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    buffer.write('\ufeff')
+    writer.writerow(headers)
+    for rows in row_batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def stream_xlsx(headers, row_batches, title='Sheet1'):
+    """以 openpyxl 唯寫模式產生 XLSX（需安裝 openpyxl）
+    
+    唯寫模式逐列寫入暫存檔，不在記憶體中保留整份工作表；
+    XLSX 為 zip 格式，須寫完後才能組合檔案，因此完成後再分段傳送
+    """
+    from openpyxl import Workbook
+    
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title)
+    worksheet.append(headers)
+    for rows in row_batches:
+        for row in rows:
+            worksheet.append(row)
+    
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(XLSX_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+def xlsx_available():
+    """是否已安裝 openpyxl"""
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return False
+    return True
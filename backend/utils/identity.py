@@ -0,0 +1,170 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from flask import current_app, jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_current_user
+from werkzeug.local import LocalProxy
+from config.database import db
+from models.user import User
+
+class TokenBlocklist:
+    """Token 黑名單（存於 MongoDB，所有 worker 共用）
+    
+    文件: {_id: 'jti:<jti>'（登出的 Token）| 'user:<user_id>'（撤銷該使用者在 revoked_at 之前簽發的所有 Token）,
+           revoked_at, expires_at}；expires_at 的 TTL 索引（見 config/indexes.py）在 Token 過期後自動清除。
+    
+    每個 worker 在記憶體中保存一份黑名單，每 refresh 秒以 revoked_at 增量同步一次，
+    驗證 Token 不需每個請求查詢資料庫；其他 worker 的撤銷最晚在 refresh 秒後生效（本 worker 立即生效）。
+    refresh 為 0 時改為每個請求直接查詢資料庫
+    """
+    
+    COLLECTION = 'revoked_tokens'
+    # 增量同步時往前重疊的秒數，容許各主機時鐘的誤差
+    SYNC_OVERLAP = timedelta(seconds=5)
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (撤銷時間戳, 過期時間戳)
+        self._synced_at = None
+        self._next_sync = 0.0
+    
+    def _remember(self, key, revoked_at, expires_at):
+        self._entries[key] = (
+            revoked_at.replace(tzinfo=timezone.utc).timestamp(),
+            expires_at.replace(tzinfo=timezone.utc).timestamp()
+        )
+    
+    def _store(self, key, revoked_at, expires_at):
+        db.get_collection(self.COLLECTION).update_one(
+            {'_id': key},
+            {'$set': {'revoked_at': revoked_at, 'expires_at': expires_at}},
+            upsert=True
+        )
+        with self._lock:
+            self._remember(key, revoked_at, expires_at)
+    
+    def revoke(self, jwt_data):
+        """登出：撤銷單一 Token 直到其過期"""
+        expires_at = datetime.utcfromtimestamp(jwt_data.get('exp', time.time()))
+        self._store(f"jti:{jwt_data['jti']}", datetime.utcnow(), expires_at)
+    
+    def revoke_user(self, user_id, expires_in):
+        """撤銷使用者目前所有的 Token（變更角色或停用帳號後使用），expires_in 為 Token 最長有效秒數"""
+        now = datetime.utcnow()
+        self._store(f'user:{user_id}', now, now + timedelta(seconds=expires_in))
+    
+    def _sync(self, refresh):
+        """距上次同步超過 refresh 秒時，讀取之後新增的撤銷並移除已過期的項目"""
+        if time.monotonic() < self._next_sync:
+            return
+        with self._lock:
+            if time.monotonic() < self._next_sync:
+                return
+            started = datetime.utcnow()
+            query = {'revoked_at': {'$gte': self._synced_at - self.SYNC_OVERLAP}} if self._synced_at else {}
+            for entry in db.get_collection(self.COLLECTION).find(query):
+                self._remember(entry['_id'], entry['revoked_at'], entry['expires_at'])
+            now = time.time()
+            self._entries = {key: value for key, value in self._entries.items() if value[1] > now}
+            self._synced_at = started
+            self._next_sync = time.monotonic() + refresh
+    
+    def _lookup(self, keys):
+        """直接查詢資料庫 {key: 撤銷時間戳}"""
+        return {
+            entry['_id']: entry['revoked_at'].replace(tzinfo=timezone.utc).timestamp()
+            for entry in db.get_collection(self.COLLECTION).find({'_id': {'$in': keys}}, {'revoked_at': 1})
+        }
+    
+    def is_revoked(self, jwt_data, user_id, refresh=0):
+        """檢查 Token 本身與使用者層級的撤銷"""
+        jti_key, user_key = f"jti:{jwt_data['jti']}", f'user:{user_id}'
+        if refresh > 0:
+            self._sync(refresh)
+            entries = self._entries
+            revoked = {key: entries[key][0] for key in (jti_key, user_key) if key in entries}
+        else:
+            revoked = self._lookup([jti_key, user_key])
+        
+        if jti_key in revoked:
+            return True
+        # iat 只到秒：與撤銷同一秒簽發的 Token 一併視為已撤銷（該秒內重新登入需再登入一次）
+        return user_key in revoked and jwt_data.get('iat', 0) <= int(revoked[user_key])
+
+blocklist = TokenBlocklist()
+
+def init_identity(jwt):
+    """註冊 JWT 使用者載入函式與 Token 黑名單檢查
+    
+    flask_jwt_extended 會在每個 @jwt_required 請求呼叫 user_lookup_loader，
+    這裡回傳延遲載入的代理物件：路由第一次存取 current_user 時才查詢資料庫，
+    之後同一請求內的存取都由 User.find_by_id 的請求範圍快取提供。
+    """
+    @jwt.user_lookup_loader
+    def load_current_user(jwt_header, jwt_data):
+        user_id = jwt_data[current_app.config['JWT_IDENTITY_CLAIM']]
+        return LocalProxy(lambda: User.find_by_id(user_id))
+    
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_data):
+        config = current_app.config
+        if not config['JWT_BLOCKLIST_ENABLED']:
+            return False
+        return blocklist.is_revoked(jwt_data, jwt_data[config['JWT_IDENTITY_CLAIM']],
+                                    refresh=config['JWT_BLOCKLIST_REFRESH'])
+    
+    @jwt.revoked_token_loader
+    def revoked_token_response(jwt_header, jwt_data):
+        return jsonify({'message': '登入已失效，請重新登入'}), 401
+
+def resolve_current_user():
+    """目前請求的 User 物件（不存在時回傳 None）
+
+    current_user 與 get_current_user() 都是延遲載入的代理物件，每次存取屬性都會重新查找；
+    同一段程式需要多次使用（例如更新後回傳資料）時以此取得實際物件
+    """
+    return get_current_user()._get_current_object()
+
+def token_claims(user):
+    """登入時寫入 JWT 的額外宣告"""
+    return {'role': user.role, 'is_active': user.is_active}
+
+def _current_role():
+    """取得目前使用者的 (角色, 是否啟用)
+    
+    JWT 宣告簽發未超過 JWT_ROLE_CLAIMS_MAX_AGE 秒時直接採用，不查詢資料庫；
+    超過時間或舊版 Token 沒有宣告時，改以資料庫中的使用者資料為準，
+    讓停用帳號或調整角色最晚在這段時間後生效；需要立即生效時以 flask revoke-user-tokens
+    撤銷該使用者的 Token（黑名單由所有 worker 共用）。使用者不存在時回傳 None。
+    """
+    claims = get_jwt()
+    max_age = current_app.config['JWT_ROLE_CLAIMS_MAX_AGE']
+    if 'role' in claims and time.time() - claims['iat'] <= max_age:
+        return claims['role'], claims.get('is_active', True)
+    
+    user = resolve_current_user()
+    if user is None:
+        return None
+    return user.role, user.is_active
+
+def role_required(*roles, message='沒有權限執行此操作'):
+    """限定角色的路由裝飾器（包含 JWT 驗證）"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            
+            current_role = _current_role()
+            if current_role is None:
+                return jsonify({'message': '使用者不存在'}), 404
+            
+            role, is_active = current_role
+            if not is_active:
+                return jsonify({'message': '帳號已被停用'}), 401
+            if role not in roles:
+                return jsonify({'message': message}), 403
+            
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
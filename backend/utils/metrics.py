@@ -0,0 +1,172 @@
+import hmac
+import ipaddress
+import os
+import time
+from flask import Response, jsonify, request
+
+try:
+    # 多 worker 時需在匯入前設定 PROMETHEUS_MULTIPROC_DIR（見 gunicorn.conf.py）
+    from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+                                   Histogram, generate_latest, multiprocess)
+except ImportError:  # 未安裝時不提供 /metrics
+    Counter = None
+
+# 延遲分布（秒）：大多數 API 在數十毫秒內完成，匯出與批次匯入可能需要數秒
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 回應大小分布（bytes）
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# 沒有對應路由（404）的請求統一記為同一個端點，避免任意路徑造成標籤數量無限增加
+UNMATCHED_ENDPOINT = '<unmatched>'
+# 請求開始時間在 WSGI environ 中的鍵
+START_KEY = 'metrics.start'
+
+class RequestMetrics:
+    """HTTP 請求指標：各端點延遲、狀態碼次數、回應大小與處理中請求數
+
+    同一個 (端點, 方法, 狀態碼) 的 labels() 子指標會快取，每個請求只需一次字典查詢與累加。
+    設定 PROMETHEUS_MULTIPROC_DIR 時各 worker 將數值寫入共用目錄，/metrics 彙總所有 worker。
+    """
+
+    def __init__(self, registry=None):
+        registry = registry if registry is not None else REGISTRY
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'HTTP 請求處理時間（秒）',
+            ['blueprint', 'endpoint', 'method'], buckets=LATENCY_BUCKETS, registry=registry
+        )
+        self.requests = Counter(
+            'http_requests_total', 'HTTP 請求次數',
+            ['blueprint', 'endpoint', 'method', 'status'], registry=registry
+        )
+        self.response_size = Histogram(
+            'http_response_size_bytes', 'HTTP 回應大小（bytes，依 Content-Length，串流回應不計）',
+            ['blueprint', 'endpoint', 'method'], buckets=SIZE_BUCKETS, registry=registry
+        )
+        self.in_progress = Gauge(
+            'http_requests_in_progress', '處理中的 HTTP 請求數',
+            multiprocess_mode='livesum', registry=registry
+        )
+        self.rate_limit = Counter(
+            'rate_limit_decisions_total', '限流判斷次數（rule 為拒絕的規則，允許時為 all）',
+            ['limiter', 'rule', 'result'], registry=registry
+        )
+        self._children = {}
+
+    def _resolve(self, endpoint, method, status):
+        """(延遲, 回應大小, 請求次數) 子指標；每個 (端點, 方法, 狀態碼) 只解析一次 labels()"""
+        blueprint = endpoint.rpartition('.')[0]
+        children = (
+            self.latency.labels(blueprint, endpoint, method),
+            self.response_size.labels(blueprint, endpoint, method),
+            self.requests.labels(blueprint, endpoint, method, str(status)),
+        )
+        self._children[(endpoint, method, status)] = children
+        return children
+
+    def observe(self, endpoint, method, status, seconds, size):
+        """記錄一個完成的請求（size 為 None 表示大小未知或不記錄）"""
+        children = self._children.get((endpoint, method, status)) or self._resolve(endpoint, method, status)
+        children[0].observe(seconds)
+        if size is not None:
+            children[1].observe(size)
+        children[2].inc()
+
+    def observe_rate_limit(self, limiter, rejected_rule):
+        """RateLimiter 的 observer：記錄一次允許或拒絕"""
+        if rejected_rule is None:
+            self.rate_limit.labels(limiter, 'all', 'allowed').inc()
+        else:
+            self.rate_limit.labels(limiter, rejected_rule, 'rejected').inc()
+
+class MetricsMiddleware:
+    """WSGI 中介層：記錄請求開始時間並維護處理中請求數
+
+    不經過 Flask 的 before_request / teardown_request，減少每個請求的額外呼叫
+    """
+
+    def __init__(self, wsgi_app, metrics):
+        self.wsgi_app = wsgi_app
+        self.metrics = metrics
+
+    def __call__(self, environ, start_response):
+        environ[START_KEY] = time.perf_counter()
+        in_progress = self.metrics.in_progress
+        in_progress.inc()
+        try:
+            return self.wsgi_app(environ, start_response)
+        finally:
+            in_progress.dec()
+
+_request_metrics = None
+
+def metrics_available():
+    return Counter is not None
+
+def request_metrics():
+    """行程內共用的請求指標（指標名稱在 registry 中只能註冊一次）"""
+    global _request_metrics
+    if _request_metrics is None:
+        _request_metrics = RequestMetrics()
+    return _request_metrics
+
+def render_metrics():
+    """Prometheus 文字格式的指標（多 worker 模式下彙總所有 worker 的數值）"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+def metrics_access_allowed(remote_addr, authorization, token):
+    """/metrics 存取檢查：設定 token 時需帶 Authorization: Bearer <token>，否則只接受本機與私有網段位址"""
+    if token:
+        scheme, _, credentials = (authorization or '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(credentials.strip().encode(), token.encode())
+    try:
+        address = ipaddress.ip_address(remote_addr or '')
+    except ValueError:
+        return False
+    return address.is_loopback or address.is_private
+
+def init_metrics(app):
+    """註冊請求指標與 /metrics（METRICS_ENABLED=false 或未安裝 prometheus_client 時停用）
+
+    需在 init_compression 之前呼叫，回應大小才會記錄壓縮後的大小。
+    /metrics 不經過 nginx 的 /api/ 轉發，只供內部的 Prometheus 抓取；
+    後端埠對外公開時設定 METRICS_TOKEN，以 Bearer Token 驗證（見 metrics_access_allowed）
+    """
+    if os.getenv('METRICS_ENABLED', 'true').lower() not in ('true', '1'):
+        return
+    if not metrics_available():
+        app.logger.warning('未安裝 prometheus_client，停用 /metrics')
+        return
+
+    metrics = request_metrics()
+    token = os.getenv('METRICS_TOKEN')
+    # 回應大小分布是每個請求成本最高的項目之一，不需要時可關閉
+    record_size = os.getenv('METRICS_RESPONSE_SIZE', 'true').lower() in ('true', '1')
+    app.wsgi_app = MetricsMiddleware(app.wsgi_app, metrics)
+
+    # 登入 / 註冊限流的允許與拒絕次數
+    from utils.rate_limit import auth_limiter
+    if metrics.observe_rate_limit not in auth_limiter.observers:
+        auth_limiter.observers.append(metrics.observe_rate_limit)
+
+    # 例外（500）產生的錯誤回應同樣會經過 after_request
+    @app.after_request
+    def record_request(response):
+        environ = request.environ
+        start = environ.get(START_KEY)
+        if start is not None:
+            # 依 Content-Length 記錄大小，不讀取回應內容（串流回應沒有此標頭，不記錄）
+            size = response.content_length if record_size else None
+            metrics.observe(request.endpoint or UNMATCHED_ENDPOINT, environ['REQUEST_METHOD'],
+                            response.status_code, time.perf_counter() - start, size)
+        return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        if not metrics_access_allowed(request.remote_addr, request.headers.get('Authorization'), token):
+            return jsonify({'message': '沒有權限存取指標'}), 403
+        return Response(render_metrics(), content_type=CONTENT_TYPE_LATEST)
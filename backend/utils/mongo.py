@@ -0,0 +1,45 @@
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from config.database import db
+
+def projection(fields):
+    """將欄位清單轉換為 MongoDB projection（None 表示取回全部欄位）"""
+    if fields is None:
+        return None
+    return {field: 1 for field in fields}
+
+class LockNotAcquired(Exception):
+    """等待逾時仍無法取得鎖"""
+
+@contextmanager
+def mongo_lock(name, key, ttl=10, wait=2.0, interval=0.05):
+    """以 MongoDB 文件實作的短時間互斥鎖（_id 唯一，同一個 key 同時只有一個持有者）
+    
+    持有者異常中斷時，超過 ttl 秒的鎖可被其他請求取代；
+    locks 集合的 TTL 索引（見 config/indexes.py）負責清除殘留的鎖文件。
+    等待超過 wait 秒仍無法取得時拋出 LockNotAcquired
+    """
+    collection = db.get_collection('locks')
+    lock_id = f'{name}:{key}'
+    token = ObjectId()
+    deadline = time.monotonic() + wait
+    
+    while True:
+        now = datetime.utcnow()
+        # 清除已逾時的鎖，再嘗試建立
+        collection.delete_one({'_id': lock_id, 'expires_at': {'$lt': now}})
+        try:
+            collection.insert_one({'_id': lock_id, 'token': token, 'expires_at': now + timedelta(seconds=ttl)})
+            break
+        except DuplicateKeyError:
+            if time.monotonic() >= deadline:
+                raise LockNotAcquired(lock_id)
+            time.sleep(interval)
+    
+    try:
+        yield
+    finally:
+        collection.delete_one({'_id': lock_id, 'token': token})
@@ -0,0 +1,56 @@
+import base64
+import json
+import os
+from datetime import datetime
+from bson import ObjectId
+
+# 分頁大小設定（伺服器端強制上限）
+DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', 50))
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 200))
+
+def get_page_size(value, default=DEFAULT_PAGE_SIZE):
+    """取得分頁大小，限制在 1 ~ MAX_PAGE_SIZE 之間"""
+    if not value or value < 1:
+        return min(default, MAX_PAGE_SIZE)
+    return min(value, MAX_PAGE_SIZE)
+
+def encode_cursor(created_at, object_id):
+    """將 (created_at, _id) 編碼為不透明的分頁游標"""
+    payload = json.dumps({'t': created_at.isoformat(), 'id': str(object_id)})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token):
+    """解碼分頁游標，格式錯誤時拋出 ValueError"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(payload['t']), ObjectId(payload['id'])
+    except Exception:
+        raise ValueError('無效的分頁游標')
+
+def keyset_filter(position, descending=False):
+    """依 (created_at, _id) 產生「下一頁」的查詢條件"""
+    created_at, object_id = position
+    op = '$lt' if descending else '$gt'
+    return {'$or': [
+        {'created_at': {op: created_at}},
+        {'created_at': created_at, '_id': {op: object_id}}
+    ]}
+
+def keyset_sort(descending=False):
+    """與 keyset_filter 對應的排序條件"""
+    direction = -1 if descending else 1
+    return [('created_at', direction), ('_id', direction)]
+
+def split_page(items, page_size):
+    """多查一筆判斷是否還有下一頁，回傳 (本頁資料, next_cursor)
+
+    items 可以是模型物件或原始 MongoDB 文件（lean 模式）
+    """
+    if len(items) <= page_size:
+        return items, None
+    items = items[:page_size]
+    last = items[-1]
+    if isinstance(last, dict):
+        return items, encode_cursor(last['created_at'], last['_id'])
+    return items, encode_cursor(last.created_at, last._id)
@@ -0,0 +1,116 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from werkzeug.security import check_password_hash
+
+# 密碼雜湊成本（bcrypt rounds），調整後舊雜湊會在使用者下次登入時自動升級
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+
+# 雜湊運算的行程數，0 表示直接在請求執行緒中計算
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('ascii')
+
+def _verify_password(password_hash, password):
+    # bcrypt 雜湊以 $2 開頭；其餘為舊版 werkzeug 格式（pbkdf2 / scrypt）
+    if password_hash.startswith('$2'):
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('ascii'))
+    return check_password_hash(password_hash, password)
+
+class PasswordHasher:
+    """密碼雜湊服務
+    
+    雜湊與驗證是刻意放慢的 CPU 運算，交給有上限的行程池執行，
+    不佔用 worker 的 GIL，登入 / 註冊高峰時其他 API 仍可正常回應。
+    """
+    
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, rounds=BCRYPT_ROUNDS):
+        self.workers = workers
+        self.rounds = rounds
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+    
+    def _get_executor(self):
+        # 行程池不可跨 fork 使用：每個 gunicorn worker 各自建立
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._pid = os.getpid()
+            return self._executor
+    
+    def _discard_executor(self, executor):
+        """捨棄已損壞的行程池（其他執行緒已重建時不重複處理）"""
+        with self._lock:
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+    
+    def _submit(self, call):
+        """以行程池執行 call(executor)
+        
+        子行程異常結束（例如被 OOM killer 終止）後行程池會永久損壞，
+        之後每次提交都拋出 BrokenProcessPool；此時重建行程池並重試一次
+        """
+        executor = self._get_executor()
+        try:
+            return call(executor)
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            return call(self._get_executor())
+    
+    def warm_up(self):
+        """預先啟動行程池
+        
+        建議在 worker 啟動、尚未開始處理請求（只有單一執行緒）時呼叫，
+        讓子行程在安全的時間點 fork，也避免第一個登入請求承擔啟動延遲
+        """
+        if self.workers > 0:
+            self._submit(lambda executor: executor.submit(int).result())
+    
+    def _run(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+        return self._submit(lambda executor: executor.submit(func, *args).result())
+    
+    def hash(self, password):
+        """產生密碼雜湊"""
+        return self._run(_hash_password, password, self.rounds)
+    
+    def hash_many(self, passwords, rounds=None):
+        """批次產生密碼雜湊（分散到行程池中的所有行程），依輸入順序回傳"""
+        rounds = rounds or self.rounds
+        if self.workers <= 0:
+            return [_hash_password(password, rounds) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return self._submit(lambda executor: list(executor.map(
+            _hash_password, passwords, [rounds] * len(passwords), chunksize=chunksize
+        )))
+    
+    def verify(self, password_hash, password):
+        """檢查密碼是否正確"""
+        if not password_hash:
+            return False
+        return self._run(_verify_password, password_hash, password)
+    
+    def needs_rehash(self, password_hash):
+        """雜湊格式或成本與目前設定不同時需要重新雜湊"""
+        if not password_hash or not password_hash.startswith('$2'):
+            return True
+        # bcrypt 格式: $2b$<rounds>$<salt+hash>
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+    
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+# 全域密碼雜湊服務
+hasher = PasswordHasher()
@@ -0,0 +1,189 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, jsonify
+
+class MemoryBucketStore:
+    """行程內的 token bucket 儲存（預設）
+
+    以 LRU 保存最多 max_keys 個 bucket，超過時移除最久未使用的一個；
+    大量不同的 key（例如以大量 email 撞庫）時記憶體與每次取用的成本都維持固定
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (剩餘 token, 上次更新時間)，依最近使用排序
+
+    def consume(self, key, capacity, refill_rate):
+        """取用一個 token，回傳 (是否允許, 需等待秒數)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / refill_rate
+
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed, retry_after
+
+class SQLiteBucketStore:
+    """以本機 SQLite 檔案儲存的 token bucket，同一台主機上的多個 worker 共用額度
+
+    每 prune_interval 次取用清除一次：閒置超過 idle_seconds（已補滿，與不存在相同）的 bucket，
+    以及超過 max_keys 時最久未使用的 bucket
+    """
+
+    def __init__(self, path, max_keys=100000, idle_seconds=3600, prune_interval=1000):
+        self.path = path
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self.prune_interval = prune_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._consumed = 0
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS buckets '
+            '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS buckets_updated ON buckets (updated)')
+
+    def _connection(self):
+        # SQLite 連線不可跨執行緒或 fork 使用
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def consume(self, key, capacity, refill_rate):
+        """取用一個 token，回傳 (是否允許, 需等待秒數)"""
+        now = time.time()
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                allowed, retry_after = True, 0
+            else:
+                allowed, retry_after = False, (1 - tokens) / refill_rate
+
+            connection.execute(
+                'INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                (key, tokens, now)
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+        with self._lock:
+            self._consumed += 1
+            prune = self._consumed % self.prune_interval == 0
+        if prune:
+            self.prune(now)
+        return allowed, retry_after
+
+    def prune(self, now=None):
+        """清除閒置與超過上限的 bucket，回傳清除筆數"""
+        now = now if now is not None else time.time()
+        connection = self._connection()
+        deleted = connection.execute('DELETE FROM buckets WHERE updated < ?', (now - self.idle_seconds,)).rowcount
+        deleted += connection.execute(
+            'DELETE FROM buckets WHERE key IN ('
+            'SELECT key FROM buckets ORDER BY updated LIMIT max(0, (SELECT COUNT(*) FROM buckets) - ?))',
+            (self.max_keys,)
+        ).rowcount
+        return deleted
+
+def parse_rate(rate):
+    """將 '次數/秒數' 轉換為 (容量, 每秒補充量)，例如 '5/60' 為 60 秒內最多 5 次"""
+    count, seconds = rate.split('/')
+    return int(count), int(count) / float(seconds)
+
+class RateLimiter:
+    """Token bucket 限流器，依多個維度（例如 IP、email）分別計算額度
+
+    observers 為 [callable(限流器名稱, 拒絕的規則名稱或 None)]，每次判斷後呼叫（例如匯出到 /metrics）
+    """
+
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+        self.observers = []
+
+    def hit(self, rules):
+        """rules 為 [(規則名稱, key, rate)]，全部允許時回傳 None，否則回傳需等待秒數"""
+        for name, key, rate in rules:
+            if not key:
+                continue
+            capacity, refill_rate = parse_rate(rate)
+            allowed, retry_after = self.store.consume(f'{name}:{key}', capacity, refill_rate)
+            if not allowed:
+                self._notify(name)
+                return retry_after
+        self._notify(None)
+        return None
+
+    def _notify(self, rejected_rule):
+        for observer in self.observers:
+            observer(self.name, rejected_rule)
+
+def create_store(backend, path=None):
+    """依設定建立儲存：memory 或 sqlite"""
+    if backend == 'sqlite':
+        return SQLiteBucketStore(path)
+    if backend == 'memory':
+        return MemoryBucketStore()
+    raise ValueError(f'不支援的限流儲存: {backend}')
+
+# 登入 / 註冊限流設定
+LOGIN_RATE_LIMIT_IP = os.getenv('LOGIN_RATE_LIMIT_IP', '20/60')
+LOGIN_RATE_LIMIT_EMAIL = os.getenv('LOGIN_RATE_LIMIT_EMAIL', '5/60')
+REGISTER_RATE_LIMIT_IP = os.getenv('REGISTER_RATE_LIMIT_IP', '10/60')
+
+auth_limiter = RateLimiter(create_store(
+    os.getenv('RATE_LIMIT_STORE', 'memory'),
+    path=os.getenv('RATE_LIMIT_SQLITE_PATH', '/tmp/student_leave_rate_limit.db')
+), name='auth')
+
+def rate_limited(*rules):
+    """限流裝飾器，在路由執行（查詢資料庫、計算密碼雜湊）前檢查額度
+
+    rules 為 (規則名稱, 取得 key 的函式, rate)
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            retry_after = auth_limiter.hit([(name, get_key(), rate) for name, get_key, rate in rules])
+            if retry_after is not None:
+                response = jsonify({'message': '嘗試次數過多，請稍後再試'})
+                response.headers['Retry-After'] = str(int(retry_after) + 1)
+                return response, 429
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def client_ip():
+    """用戶端 IP（在反向代理後方時需設定 PROXY_FIX_X_FOR）"""
+    return request.remote_addr
+
+def request_email():
+    """請求內容中的 email（正規化為小寫）"""
+    data = request.get_json(silent=True) or {}
+    email = data.get('email')
+    return email.lower().strip() if isinstance(email, str) else None
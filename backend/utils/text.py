@@ -0,0 +1,22 @@
+import re
+
+# 中日韓文字（不含標點）與英數字詞
+_CJK_RUN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af]+')
+_WORD = re.compile(r'[0-9a-z]+')
+
+def ngram_tokens(text, query=False):
+    """將文字切成可建立索引的詞元（中文不以空白分詞，改用 n-gram）
+    
+    儲存時產生單字與相鄰二字（bigram），英數字以整個字詞為單位；
+    查詢時連續兩字以上的中文只取 bigram，比對條件為全部詞元都出現
+    """
+    text = (text or '').lower()
+    tokens = set(_WORD.findall(text))
+    for run in _CJK_RUN.findall(text):
+        bigrams = {run[i:i + 2] for i in range(len(run) - 1)}
+        if query and bigrams:
+            tokens.update(bigrams)
+        else:
+            tokens.update(run)
+            tokens.update(bigrams)
+    return sorted(tokens)
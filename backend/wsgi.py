@@ -0,0 +1,8 @@
+"""
+WSGI 進入點（生產環境）
+gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from app import create_app
+
+app = create_app()
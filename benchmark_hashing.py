@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+密碼雜湊效能測試
+比較在請求執行緒中直接計算與交給行程池計算時：
+1. 同時登入的密碼驗證吞吐量
+2. 登入高峰期間，其他輕量請求（以小段 Python 運算模擬）的延遲
+3. 批次匯入帳號時（hash_many）每秒可產生的雜湊數，以及換算匯入 10,000 個帳號所需時間
+
+HTTP 層級的登入吞吐量請使用:
+    python benchmark_load.py --scenario login --concurrency 50 --requests 500
+"""
+
+import os
+import sys
+import threading
+import time
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from utils.passwords import PasswordHasher, BCRYPT_ROUNDS  # noqa: E402
+from models.user import IMPORT_BCRYPT_ROUNDS  # noqa: E402
+
+CONCURRENT_LOGINS = 16
+LOGIN_COUNT = 64
+IMPORT_SAMPLE = 200
+PROBE_PAYLOAD = [{'id': i, 'reason': '請假原因' * 5} for i in range(200)]
+
+
+def probe_latencies(stop):
+    """模擬其他 API：反覆執行小段 JSON 序列化並記錄耗時"""
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        json.dumps(PROBE_PAYLOAD, ensure_ascii=False)
+        latencies.append((time.perf_counter() - started) * 1000)
+        time.sleep(0.005)
+    return latencies
+
+
+def run(hasher, password_hash):
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as probe_executor:
+        probe = probe_executor.submit(probe_latencies, stop)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=CONCURRENT_LOGINS) as executor:
+            list(executor.map(lambda _: hasher.verify(password_hash, 'password123'), range(LOGIN_COUNT)))
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        latencies = sorted(probe.result())
+
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0
+    return LOGIN_COUNT / elapsed, p99
+
+
+def main():
+    workers = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    inline = PasswordHasher(workers=0)
+    pooled = PasswordHasher(workers=workers)
+    pooled.warm_up()
+
+    password_hash = inline.hash('password123')
+
+    print(f"🧪 密碼雜湊效能測試 (bcrypt rounds={BCRYPT_ROUNDS}, 同時登入 {CONCURRENT_LOGINS})")
+    print("=" * 60)
+    print(f"{'模式':<16} | {'登入/秒':>10} | {'其他請求 p99 (ms)':>18}")
+    print("-" * 60)
+    for name, hasher in [('請求執行緒', inline), (f'行程池 x{workers}', pooled)]:
+        throughput, p99 = run(hasher, password_hash)
+        print(f"{name:<16} | {throughput:>10.1f} | {p99:>18.2f}")
+
+    print()
+    print(f"批次匯入雜湊 (rounds={IMPORT_BCRYPT_ROUNDS}, 樣本 {IMPORT_SAMPLE} 筆)")
+    print("-" * 60)
+    passwords = [f'password{i}' for i in range(IMPORT_SAMPLE)]
+    for name, hasher in [('請求執行緒', inline), (f'行程池 x{workers}', pooled)]:
+        started = time.perf_counter()
+        hasher.hash_many(passwords, rounds=IMPORT_BCRYPT_ROUNDS)
+        rate = IMPORT_SAMPLE / (time.perf_counter() - started)
+        print(f"{name:<16} | {rate:>10.1f} 筆/秒 | 10,000 筆約 {10000 / rate:>7.0f} 秒")
+
+    pooled.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+學生請假系統負載測試腳本
+以多執行緒同時發送請求，量測吞吐量與延遲分佈
+
+使用前請先執行 test_data_setup.py 建立測試帳號與資料。
+比較開發伺服器與 gunicorn 時，分別啟動後對同一情境執行：
+
+    cd backend && python app.py                          # 開發伺服器
+    cd backend && gunicorn -c gunicorn.conf.py wsgi:app  # 生產環境模式
+
+    python benchmark_load.py --scenario pending --concurrency 50 --requests 2000
+
+比較執行緒模式與 gevent 高併發模式時，以 --sweep 測試多種同時連線數：
+
+    GUNICORN_WORKER_CLASS=gevent gunicorn -c gunicorn.conf.py wsgi:app
+
+    python benchmark_load.py --scenario pending --sweep 10,50,100,200 --requests 2000
+
+login 情境會受到登入限流影響，測試時請暫時調高 LOGIN_RATE_LIMIT_IP / LOGIN_RATE_LIMIT_EMAIL；
+register 情境（每次以新的 Email 註冊）則需調高 REGISTER_RATE_LIMIT_IP。
+"""
+
+import argparse
+import itertools
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE_URL = "http://localhost:5000/api"
+
+TEACHER = {"email": "teacher1@example.com", "password": "password123"}
+STUDENT = {"email": "student1@example.com", "password": "password123"}
+
+_local = threading.local()
+
+
+def session():
+    """每個執行緒使用自己的連線（keep-alive）"""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def login(account):
+    response = requests.post(f"{BASE_URL}/auth/login", json=account)
+    if response.status_code != 200:
+        raise SystemExit(f"❌ 登入失敗: {response.json()}")
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+def build_scenarios():
+    """各情境回傳一個發送單一請求的函式"""
+    teacher_headers = login(TEACHER)
+    student_headers = login(STUDENT)
+    run_id = uuid.uuid4().hex[:8]
+    counter = itertools.count()
+
+    def register():
+        email = f"load-{run_id}-{next(counter)}@example.com"
+        return session().post(f"{BASE_URL}/auth/register", json={"email": email, "password": "password123"})
+
+    return {
+        "pending": lambda: session().get(f"{BASE_URL}/leave/pending", headers=teacher_headers),
+        "my-requests": lambda: session().get(f"{BASE_URL}/leave/my-requests", headers=student_headers),
+        "me": lambda: session().get(f"{BASE_URL}/auth/me", headers=student_headers),
+        # 只驗證 JWT（與黑名單查詢）後回傳固定清單，用來比較伺服器本身的處理能力
+        "types": lambda: session().get(f"{BASE_URL}/leave/types", headers=student_headers),
+        "login": lambda: session().post(f"{BASE_URL}/auth/login", json=STUDENT),
+        "register": register,
+    }
+
+
+def timed(call):
+    started = time.perf_counter()
+    try:
+        response = call()
+        ok = response.status_code < 400
+    except requests.RequestException:
+        ok = False
+    return ok, (time.perf_counter() - started) * 1000
+
+
+def run(call, concurrency, total):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = time.perf_counter()
+        results = list(executor.map(lambda _: timed(call), range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    errors = sum(1 for ok, _ in results if not ok)
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    return {
+        "throughput": total / elapsed,
+        "mean": statistics.mean(latencies),
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "errors": errors,
+    }
+
+
+def sweep(call, levels, args):
+    """依序以不同同時連線數執行，輸出比較表"""
+    print(f"🧪 情境: {args.scenario}  總請求: {args.requests}")
+    print("=" * 64)
+    print(f"{'同時連線':>8} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'失敗':>5}")
+    print("-" * 64)
+    for level in levels:
+        result = run(call, level, args.requests)
+        print(f"{level:>8} | {result['throughput']:>8.1f} | {result['p50']:>8.1f} | "
+              f"{result['p95']:>8.1f} | {result['p99']:>8.1f} | {result['errors']:>5}")
+
+
+def main():
+    global BASE_URL
+
+    parser = argparse.ArgumentParser(description="學生請假系統負載測試")
+    parser.add_argument("--url", default=BASE_URL, help="API 基礎 URL")
+    parser.add_argument("--scenario", default="pending",
+                        choices=["pending", "my-requests", "me", "types", "login", "register"])
+    parser.add_argument("--concurrency", type=int, default=20, help="同時連線數")
+    parser.add_argument("--requests", type=int, default=1000, help="總請求數")
+    parser.add_argument("--sweep", help="依序測試多種同時連線數，例如 10,50,100,200")
+    args = parser.parse_args()
+    BASE_URL = args.url
+
+    scenarios = build_scenarios()
+    call = scenarios[args.scenario]
+
+    # 暖身，避免第一次連線與快取影響結果
+    run(call, min(args.concurrency, 5), 20)
+
+    if args.sweep:
+        sweep(call, [int(level) for level in args.sweep.split(",")], args)
+        return
+
+    print(f"🧪 情境: {args.scenario}  同時連線: {args.concurrency}  總請求: {args.requests}")
+    print("=" * 50)
+    result = run(call, args.concurrency, args.requests)
+    print(f"吞吐量: {result['throughput']:.1f} req/s")
+    print(f"平均延遲: {result['mean']:.1f} ms")
+    print(f"p50 / p95 / p99: {result['p50']:.1f} / {result['p95']:.1f} / {result['p99']:.1f} ms")
+    print(f"失敗請求: {result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+請求指標效能測試
+比較每個請求記錄指標（延遲、狀態碼、處理中請求數、回應大小）的額外成本：
+1. RequestMetrics 的記錄成本（單一行程 / gunicorn 多 worker 模式 / 多 worker 且 METRICS_RESPONSE_SIZE=false）
+2. Flask 實際處理請求（直接呼叫 WSGI 應用程式）時，開啟與關閉指標的差異
+
+多 worker 模式需在匯入 prometheus_client 前設定 PROMETHEUS_MULTIPROC_DIR，
+因此以子行程分別執行：
+
+    python benchmark_metrics.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+RECORD_ROUNDS = 200000
+REQUEST_ROUNDS = 5000
+REQUEST_ROUNDS_REPEAT = 8
+ENDPOINTS = ['leave.get_pending_requests', 'leave.get_my_requests', 'auth.login', 'auth.get_current_user']
+
+
+def benchmark_record():
+    """每個請求的記錄成本（處理中請求數加減 + observe）"""
+    from utils.metrics import request_metrics
+
+    metrics = request_metrics()
+    size = 2048 if os.getenv('METRICS_RESPONSE_SIZE', 'true').lower() in ('true', '1') else None
+    start = time.perf_counter()
+    for i in range(RECORD_ROUNDS):
+        endpoint = ENDPOINTS[i % len(ENDPOINTS)]
+        metrics.in_progress.inc()
+        metrics.observe(endpoint, 'GET', 200, 0.012, size)
+        metrics.in_progress.dec()
+    return (time.perf_counter() - start) / RECORD_ROUNDS * 1e6
+
+
+def create_app(enabled):
+    """只有一個簡單端點的應用程式，開啟或關閉指標"""
+    from flask import Flask, jsonify
+    from utils.metrics import init_metrics
+
+    os.environ['METRICS_ENABLED'] = 'true' if enabled else 'false'
+    app = Flask(__name__)
+    init_metrics(app)
+
+    @app.route('/ping')
+    def ping():
+        return jsonify({'message': 'ok'})
+
+    return app
+
+
+def benchmark_requests():
+    """直接呼叫 WSGI 應用程式處理請求的平均時間 (關閉指標, 開啟指標)
+
+    兩者交替執行多輪並各取最佳值，降低機器負載波動的影響
+    """
+    from werkzeug.test import EnvironBuilder
+
+    environ = EnvironBuilder(path='/ping').get_environ()
+    apps = [create_app(False), create_app(True)]
+    best = [float('inf'), float('inf')]
+
+    def start_response(status, headers, exc_info=None):
+        pass
+
+    for _ in range(REQUEST_ROUNDS_REPEAT):
+        for i, app in enumerate(apps):
+            start = time.perf_counter()
+            for _ in range(REQUEST_ROUNDS):
+                b''.join(app(dict(environ), start_response))
+            best[i] = min(best[i], (time.perf_counter() - start) / REQUEST_ROUNDS * 1e6)
+    return best
+
+
+def run_mode(mode):
+    """子行程：輸出指定模式的測試結果"""
+    record = benchmark_record()
+    without, with_metrics = benchmark_requests()
+    print(f"{mode}\t{record:.2f}\t{without:.1f}\t{with_metrics:.1f}")
+
+
+def main():
+    print("🧪 請求指標效能測試")
+    print("=" * 60)
+    print(f"{'模式':<16}{'記錄成本':>12}{'關閉指標':>12}{'開啟指標':>12}{'差異':>10}  (µs / 請求)")
+
+    for mode in ('單一行程', '多 worker', '多 worker 不記大小'):
+        env = {**os.environ}
+        env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+        env['METRICS_RESPONSE_SIZE'] = 'false' if mode == '多 worker 不記大小' else 'true'
+        with tempfile.TemporaryDirectory() as directory:
+            if mode != '單一行程':
+                env['PROMETHEUS_MULTIPROC_DIR'] = directory
+            output = subprocess.run(
+                [sys.executable, __file__, '--mode', mode],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+        _, record, without, with_metrics = output.split('\t')
+        difference = float(with_metrics) - float(without)
+        print(f"{mode:<16}{record:>12}{without:>12}{with_metrics:>12}{difference:>10.1f}")
+
+    print("=" * 60)
+    print("記錄成本為指標本身的操作；差異另包含 WSGI 中介層與 after_request 的呼叫")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == '--mode':
+        run_mode(sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+請假日期重疊檢查效能測試
+在獨立的測試資料庫中為一位學生建立 10,000 筆歷史申請，比較不同索引下
+重疊查詢的延遲與掃描筆數（keys / docs examined）：
+
+1. 只有 user_id 索引
+2. (user_id, start_date, end_date)
+3. (user_id, end_date, start_date)  ← 實際採用
+
+需要可連線的 MongoDB：
+    MONGODB_URI=mongodb://localhost:27017 python benchmark_overlap.py
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from bson import ObjectId  # noqa: E402
+from pymongo import MongoClient  # noqa: E402
+from models.leave_request import ACTIVE_STATUSES  # noqa: E402
+
+MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017')
+BENCHMARK_DATABASE = 'student_leave_benchmark'
+
+HISTORY = 10000
+ROUNDS = 200
+
+INDEXES = {
+    'user_id': [('user_id', 1)],
+    'user_id, start_date, end_date': [('user_id', 1), ('start_date', 1), ('end_date', 1)],
+    'user_id, end_date, start_date': [('user_id', 1), ('end_date', 1), ('start_date', 1)],
+}
+
+
+def build_history(collection, user_id):
+    """每兩天一筆、約 55 年的歷史申請，最後幾筆在未來"""
+    first = datetime.utcnow() - timedelta(days=2 * (HISTORY - 5))
+    statuses = ['approved', 'rejected', 'approved', 'pending']
+    collection.insert_many([
+        {
+            'user_id': user_id,
+            'leave_type': 'sick',
+            'start_date': first + timedelta(days=2 * i),
+            'end_date': first + timedelta(days=2 * i),
+            'status': statuses[i % len(statuses)],
+            'created_at': first + timedelta(days=2 * i),
+        }
+        for i in range(HISTORY)
+    ])
+
+
+def overlap_query(user_id, start_date, end_date):
+    """與 LeaveRequest.find_overlapping 相同的條件"""
+    return {
+        'user_id': user_id,
+        'end_date': {'$gte': start_date},
+        'start_date': {'$lte': end_date},
+        'status': {'$in': list(ACTIVE_STATUSES)},
+    }
+
+
+def main():
+    client = MongoClient(MONGODB_URI)
+    client.drop_database(BENCHMARK_DATABASE)
+    collection = client[BENCHMARK_DATABASE]['leave_requests']
+
+    user_id = ObjectId()
+    build_history(collection, user_id)
+
+    # 新申請：下週的三天假
+    start_date = datetime.utcnow() + timedelta(days=7)
+    query = overlap_query(user_id, start_date, start_date + timedelta(days=2))
+
+    print(f"🧪 日期重疊檢查效能測試 (歷史申請 {HISTORY} 筆, 平均 {ROUNDS} 次)")
+    print("=" * 72)
+    print(f"{'索引':<32} | {'平均 (ms)':>9} | {'keys 掃描':>9} | {'docs 掃描':>9}")
+    print("-" * 72)
+    for name, keys in INDEXES.items():
+        collection.drop_indexes()
+        collection.create_index(keys)
+
+        stats = collection.find(query).explain()['executionStats']
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            list(collection.find(query).limit(10))
+        elapsed = (time.perf_counter() - started) / ROUNDS * 1000
+
+        print(f"{name:<32} | {elapsed:>9.2f} | {stats['totalKeysExamined']:>9} | {stats['totalDocsExamined']:>9}")
+
+    client.drop_database(BENCHMARK_DATABASE)
+
+
+if __name__ == "__main__":
+    main()
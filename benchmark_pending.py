@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+待審核清單申請人查詢效能測試
+比較逐筆 User.find_by_id 與批次 User.find_summaries_by_ids 的 MongoDB 往返次數
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from pymongo import monitoring
+
+# 使用獨立的測試資料庫，避免影響正式資料
+os.environ.setdefault('MONGODB_URI', 'mongodb://localhost:27017')
+os.environ['MONGODB_DATABASE'] = os.getenv('BENCHMARK_DATABASE', 'student_leave_benchmark')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+
+class CommandCounter(monitoring.CommandListener):
+    """計算送往 MongoDB 的指令數量"""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name in ('find', 'getMore', 'aggregate'):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+counter = CommandCounter()
+monitoring.register(counter)
+
+from config.database import db  # noqa: E402
+from models.leave_request import LeaveRequest  # noqa: E402
+from models.user import User, profile_cache  # noqa: E402
+
+QUEUE_SIZES = [10, 100, 1000, 5000]
+STUDENT_COUNT = 200
+
+
+def seed(queue_size):
+    """建立測試用的學生與待審核申請"""
+    database = db.get_database()
+    database.users.delete_many({})
+    database.leave_requests.delete_many({})
+
+    now = datetime.utcnow()
+    students = [{
+        'email': f'bench{i}@example.com',
+        'password_hash': 'x',
+        'role': 'student',
+        'name': f'學生{i}',
+        'student_id': f'B{i:05d}',
+        'is_active': True,
+        'created_at': now,
+        'updated_at': now
+    } for i in range(STUDENT_COUNT)]
+    user_ids = database.users.insert_many(students).inserted_ids
+
+    database.leave_requests.insert_many([{
+        'user_id': user_ids[i % STUDENT_COUNT],
+        'leave_type': 'sick',
+        'start_date': now + timedelta(days=1),
+        'end_date': now + timedelta(days=2),
+        'reason': '效能測試',
+        'status': 'pending',
+        'created_at': now + timedelta(seconds=i),
+        'updated_at': now + timedelta(seconds=i)
+    } for i in range(queue_size)])
+
+
+def per_row_lookup(requests):
+    """舊做法：每筆申請各查一次申請人"""
+    for request in requests:
+        User.find_by_id(request.user_id)
+
+
+def batched_lookup(requests):
+    """新做法：一次 $in 查詢取得所有申請人"""
+    User.find_summaries_by_ids({req.user_id for req in requests})
+
+
+def measure(func, requests):
+    # 清除跨請求的使用者快取，每種做法與待審核筆數都實際查詢 MongoDB
+    profile_cache.clear()
+    counter.count = 0
+    started = time.perf_counter()
+    func(requests)
+    elapsed = (time.perf_counter() - started) * 1000
+    return counter.count, elapsed
+
+
+def main():
+    print("🧪 待審核清單申請人查詢效能測試")
+    print("=" * 64)
+    print(f"{'待審核筆數':>10} | {'逐筆查詢 (次/ms)':>20} | {'批次查詢 (次/ms)':>20}")
+    print("-" * 64)
+
+    for queue_size in QUEUE_SIZES:
+        seed(queue_size)
+        requests = LeaveRequest.find_all_pending()
+
+        per_row_calls, per_row_ms = measure(per_row_lookup, requests)
+        batched_calls, batched_ms = measure(batched_lookup, requests)
+
+        print(f"{queue_size:>10} | {per_row_calls:>8} / {per_row_ms:>9.1f} | "
+              f"{batched_calls:>8} / {batched_ms:>9.1f}")
+
+    db.get_database().client.drop_database(os.environ['MONGODB_DATABASE'])
+    print("=" * 64)
+    print("批次查詢的往返次數只與申請人數有關（每批最多一次 find + getMore），不隨待審核筆數增加")
+
+
+if __name__ == "__main__":
+    main()
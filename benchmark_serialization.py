@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+回應序列化與壓縮效能測試
+以 1000 筆待審核申請（與 /api/leave/pending 相同的欄位與申請人資訊）比較：
+1. 各 JSON provider 的序列化時間
+2. 未壓縮、gzip、brotli（有安裝時）的傳輸大小與壓縮時間
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from bson import ObjectId  # noqa: E402
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from models.leave_request import LeaveRequest, PENDING_LIST_FIELDS  # noqa: E402
+from utils import compression  # noqa: E402
+from utils.json_provider import MongoJSONProvider, OrjsonProvider, orjson  # noqa: E402
+
+ROWS = 1000
+ROUNDS = 20
+
+
+def build_payload():
+    """建立與 /pending 回應相同結構的資料"""
+    now = datetime.utcnow()
+    requests = []
+    for i in range(ROWS):
+        created_at = now - timedelta(minutes=i)
+        document = {
+            '_id': ObjectId(),
+            'user_id': ObjectId(),
+            'leave_type': 'sick',
+            'start_date': now + timedelta(days=i % 30),
+            'end_date': now + timedelta(days=i % 30 + 1),
+            'reason': f'身體不適需要就醫休息，第 {i} 筆測試資料',
+            'status': 'pending',
+            'emergency_contact': '0912-345-678',
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+        request_dict = LeaveRequest.document_to_dict(document, PENDING_LIST_FIELDS)
+        request_dict['applicant'] = {'name': f'學生{i}', 'email': f'student{i}@example.com', 'student_id': f'S{i:05d}'}
+        requests.append(request_dict)
+    return {'message': '獲取待審核申請成功', 'requests': requests, 'next_cursor': None}
+
+
+def legacy_dumps(provider, payload):
+    """改版前的作法：先手動轉換 ObjectId / datetime，再以 Flask 預設設定（ASCII 跳脫、排序鍵）序列化"""
+    converted = {**payload, 'requests': [
+        {key: (value.isoformat() if isinstance(value, datetime) else str(value) if isinstance(value, ObjectId) else value)
+         for key, value in request_dict.items()}
+        for request_dict in payload['requests']
+    ]}
+    return provider.response(converted).get_data()
+
+
+def timed(func):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = func()
+    return result, (time.perf_counter() - started) / ROUNDS * 1000
+
+
+def main():
+    app = Flask(__name__)
+    payload = build_payload()
+
+    # 與實際 API 相同，量測建立回應內容（jsonify）的時間
+    providers = [('Flask 預設 (改版前)', lambda: legacy_dumps(DefaultJSONProvider(app), payload))]
+    providers.append(('標準 json (UTF-8)', lambda: MongoJSONProvider(app).response(payload).get_data()))
+    if orjson:
+        providers.append(('orjson', lambda: OrjsonProvider(app).response(payload).get_data()))
+
+    print(f"🧪 序列化效能測試 ({ROWS} 筆待審核申請, 平均 {ROUNDS} 次)")
+    print("=" * 56)
+    print(f"{'JSON provider':<22} | {'時間 (ms)':>10} | {'大小 (KB)':>10}")
+    print("-" * 56)
+    body = None
+    for name, dumps in providers:
+        body, elapsed = timed(dumps)
+        print(f"{name:<22} | {elapsed:>10.2f} | {len(body) / 1024:>10.1f}")
+
+    print()
+    print(f"{'壓縮方式':<22} | {'時間 (ms)':>10} | {'大小 (KB)':>10}")
+    print("-" * 56)
+    print(f"{'未壓縮':<22} | {0:>10.2f} | {len(body) / 1024:>10.1f}")
+    encodings = ['gzip'] + (['br'] if compression.brotli else [])
+    for encoding in encodings:
+        compressed, elapsed = timed(lambda: compression.compress(body, encoding))
+        print(f"{encoding:<22} | {elapsed:>10.2f} | {len(compressed) / 1024:>10.1f}")
+    if not compression.brotli:
+        print("（未安裝 brotli，略過 brotli 測試）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+伺服器模式效能比較
+依序啟動開發伺服器、gunicorn 執行緒模式 (gthread) 與協程模式 (gevent)，
+對每種模式以 benchmark_load.py 的情境測試多種同時連線數並輸出比較表。
+
+預設連線 MONGODB_URI 的資料庫（例如 docker-compose 的 MongoDB），使用前請先執行 test_data_setup.py：
+
+    python benchmark_servers.py --scenario pending --sweep 10,50,100
+
+沒有 MongoDB 時可加上 --mongomock（需 pip install mongomock）：每個伺服器行程使用記憶體資料庫，
+啟動時建立測試帳號與待審核申請；--db-latency-ms 在每次資料庫操作前等待指定毫秒數，模擬網路往返，
+才能比較執行緒與協程模式在等待資料庫時的差異。此模式不包含真實的查詢成本，只適合比較伺服器模式：
+
+    python benchmark_servers.py --mongomock --db-latency-ms 2 --scenario pending --sweep 1,10,50
+"""
+
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.join(ROOT, 'backend')
+
+SERVERS = {
+    # 名稱: (說明, GUNICORN_WORKER_CLASS；None 表示開發伺服器)
+    'dev': ('開發伺服器', None),
+    'gthread': ('gunicorn gthread', 'gthread'),
+    'gevent': ('gunicorn gevent', 'gevent'),
+}
+
+SEED_REQUESTS = 50
+
+
+def use_mongomock(latency_ms):
+    """以 mongomock 取代 MongoDB（只用於本測試的伺服器行程）
+
+    fork 前建立的資料由各 gunicorn worker 各自持有一份複本，因此只適合唯讀的測試情境
+    """
+    import mongomock
+    from config import database
+
+    mock_database = mongomock.MongoClient()[os.environ.get('MONGODB_DATABASE') or 'student_leave_system']
+    delay = latency_ms / 1000
+
+    class SlowCollection:
+        """每次呼叫集合方法前等待 delay 秒，模擬一次資料庫往返"""
+
+        def __init__(self, collection):
+            self._collection = collection
+
+        def __getattr__(self, name):
+            attribute = getattr(self._collection, name)
+            if not callable(attribute) or name.startswith('_'):
+                return attribute
+
+            def call(*args, **kwargs):
+                time.sleep(delay)
+                return attribute(*args, **kwargs)
+            return call
+
+    class SlowDatabase:
+        def __init__(self, database):
+            self._database = database
+
+        def __getitem__(self, name):
+            return SlowCollection(self._database[name])
+
+        def __getattr__(self, name):
+            return getattr(self._database, name)
+
+    target = SlowDatabase(mock_database) if delay > 0 else mock_database
+    database.Database.get_database = lambda self: target
+    database.Database.reset = lambda self: None
+    database.Database.warm_up = lambda self: None
+    return mock_database
+
+
+def create_mock_app():
+    """gunicorn 與開發伺服器在 --mongomock 模式下載入的應用程式（含測試帳號與待審核申請）"""
+    sys.path.insert(0, BACKEND)
+    mock_database = use_mongomock(float(os.environ.get('BENCHMARK_DB_LATENCY_MS', 0)))
+
+    from app import create_app
+    app = create_app()
+    client = app.test_client()
+    for email, role in (('student1@example.com', 'student'), ('teacher1@example.com', 'teacher')):
+        client.post('/api/auth/register', json={
+            'email': email, 'password': 'password123', 'role': role, 'name': email.split('@')[0]
+        })
+
+    student = mock_database.users.find_one({'email': 'student1@example.com'})
+    now = datetime.utcnow()
+    mock_database.leave_requests.insert_many([{
+        'user_id': student['_id'],
+        'leave_type': 'sick',
+        'start_date': now + timedelta(days=i + 1),
+        'end_date': now + timedelta(days=i + 1),
+        'reason': '效能測試',
+        'status': 'pending',
+        'created_at': now + timedelta(seconds=i),
+        'updated_at': now + timedelta(seconds=i),
+    } for i in range(SEED_REQUESTS)])
+    return app
+
+
+def server_command(name, args):
+    worker_class = SERVERS[name][1]
+    if worker_class is None:
+        if args.mongomock:
+            return [sys.executable, os.path.abspath(__file__), '--serve-dev']
+        return [sys.executable, 'app.py']
+    app_spec = 'benchmark_servers:create_mock_app()' if args.mongomock else 'wsgi:app'
+    return ['gunicorn', '-c', 'gunicorn.conf.py', '--pythonpath', ROOT, app_spec]
+
+
+def server_env(name, args):
+    env = {
+        **os.environ,
+        'HOST': '127.0.0.1',
+        'PORT': str(args.port),
+        'FLASK_DEBUG': 'false',
+        'GUNICORN_ACCESS_LOG': '/dev/null',
+        'BENCHMARK_DB_LATENCY_MS': str(args.db_latency_ms),
+    }
+    if args.mongomock:
+        # 每個 worker 的資料各自獨立，不需要啟動時建立索引；未設定金鑰時使用測試用金鑰
+        env['ENSURE_INDEXES'] = 'false'
+        env.setdefault('JWT_SECRET_KEY', 'benchmark-jwt-secret-key-not-for-production')
+        env.setdefault('SECRET_KEY', 'benchmark-secret-key-not-for-production')
+    worker_class = SERVERS[name][1]
+    if worker_class:
+        env['GUNICORN_WORKER_CLASS'] = worker_class
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    return env
+
+
+def wait_for_port(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def benchmark_server(name, args, levels):
+    """啟動指定伺服器並依序測試各同時連線數，回傳 [(同時連線數, 結果)]"""
+    import benchmark_load as load
+
+    with tempfile.TemporaryFile() as log:
+        process = subprocess.Popen(server_command(name, args), cwd=BACKEND, env=server_env(name, args),
+                                   stdout=subprocess.DEVNULL, stderr=log)
+        try:
+            if not wait_for_port(args.port, process):
+                log.seek(0)
+                raise SystemExit(f"❌ {SERVERS[name][0]} 啟動失敗:\n{log.read().decode(errors='replace')[-2000:]}")
+
+            load.BASE_URL = f'http://127.0.0.1:{args.port}/api'
+            call = load.build_scenarios()[args.scenario]
+            load.run(call, min(levels[0], 5), 20)  # 暖身
+            return [(level, load.run(call, level, args.requests)) for level in levels]
+        finally:
+            # SIGINT 為 gunicorn 的快速關閉，不等待 keep-alive 連線
+            process.send_signal(signal.SIGINT)
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='伺服器模式效能比較')
+    parser.add_argument('--servers', default='dev,gthread,gevent', help='要比較的伺服器：dev,gthread,gevent')
+    parser.add_argument('--scenario', default='pending',
+                        choices=['pending', 'my-requests', 'me', 'types'])
+    parser.add_argument('--sweep', default='1,10,50', help='同時連線數，例如 1,10,50')
+    parser.add_argument('--requests', type=int, default=2000, help='每種同時連線數的總請求數')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--mongomock', action='store_true', help='以 mongomock 取代 MongoDB')
+    parser.add_argument('--db-latency-ms', type=float, default=0, help='--mongomock 時每次資料庫操作的模擬延遲')
+    parser.add_argument('--serve-dev', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_dev:
+        create_mock_app().run(host='127.0.0.1', port=int(os.environ['PORT']), threaded=True)
+        return
+
+    sys.path.insert(0, ROOT)
+    levels = [int(level) for level in args.sweep.split(',')]
+    database = f"mongomock（模擬延遲 {args.db_latency_ms:g} ms）" if args.mongomock else os.getenv('MONGODB_URI', 'MONGODB_URI')
+    print(f"🧪 情境: {args.scenario}  資料庫: {database}  每種同時連線數 {args.requests} 個請求")
+    print("=" * 78)
+    print(f"{'伺服器':<18} | {'同時連線':>8} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'失敗':>5}")
+    print("-" * 78)
+    for name in args.servers.split(','):
+        for level, result in benchmark_server(name, args, levels):
+            print(f"{SERVERS[name][0]:<18} | {level:>8} | {result['throughput']:>8.1f} | {result['p50']:>8.1f} | "
+                  f"{result['p95']:>8.1f} | {result['p99']:>8.1f} | {result['errors']:>5}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
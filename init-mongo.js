@@ -1,21 +1,9 @@
 // MongoDB 初始化腳本
 db = db.getSiblingDB('student_leave_system');
 
-// 建立使用者集合索引
+// 索引定義在後端 config/indexes.py，後端啟動時（或執行 flask ensure-indexes）自動建立，
+// 既有的資料庫也會補上新增的索引；這裡只先建立 Email 唯一索引，確保下方測試資料不會重複
 db.users.createIndex({ "email": 1 }, { unique: true });
-db.users.createIndex({ "student_id": 1 });
-db.users.createIndex({ "role": 1 });
-db.users.createIndex({ "created_at": 1 });
-
-// 建立請假申請集合索引
-db.leave_requests.createIndex({ "user_id": 1 });
-db.leave_requests.createIndex({ "status": 1 });
-db.leave_requests.createIndex({ "start_date": 1 });
-db.leave_requests.createIndex({ "end_date": 1 });
-db.leave_requests.createIndex({ "leave_type": 1 });
-db.leave_requests.createIndex({ "created_at": 1 });
-db.leave_requests.createIndex({ "user_id": 1, "status": 1 });
-db.leave_requests.createIndex({ "user_id": 1, "created_at": -1 });
 
 // 插入測試資料 (可選)
 db.users.insertOne({
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+測試多位老師同時審核同一筆請假申請
+每筆申請應該只有一次審核成功，其餘請求回傳「此請假申請已被處理」
+"""
+
+import random
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+BASE_URL = "http://localhost:5000/api"
+
+REQUEST_COUNT = 20        # 測試的請假申請數
+REVIEWS_PER_REQUEST = 8   # 每筆申請同時送出的審核次數
+
+def login(email, password="password123"):
+    """登入並回傳 Authorization header"""
+    response = requests.post(f"{BASE_URL}/auth/login", json={
+        "email": email,
+        "password": password
+    })
+    if response.status_code != 200:
+        print(f"❌ 登入失敗: {email} - {response.json().get('message', '未知錯誤')}")
+        return None
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+def create_requests(headers):
+    """建立測試用的請假申請（日期錯開，避免彼此重疊）"""
+    base = datetime.now() + timedelta(days=random.randint(1000, 5000))
+    request_ids = []
+    for i in range(REQUEST_COUNT):
+        day = base + timedelta(days=i * 2)
+        response = requests.post(f"{BASE_URL}/leave/apply", json={
+            "leave_type": "personal",
+            "start_date": day.strftime("%Y-%m-%d"),
+            "end_date": day.strftime("%Y-%m-%d"),
+            "reason": f"併發審核測試 {i + 1}"
+        }, headers=headers)
+        if response.status_code == 201:
+            request_ids.append(response.json()['request_id'])
+        else:
+            print(f"❌ 建立請假申請失敗: {response.json().get('message', '未知錯誤')}")
+    return request_ids
+
+def review(request_id, headers, index):
+    """核准或拒絕（交錯送出兩種審核）"""
+    if index % 2 == 0:
+        response = requests.post(
+            f"{BASE_URL}/leave/approve/{request_id}",
+            json={"teacher_note": "併發測試核准"},
+            headers=headers
+        )
+    else:
+        response = requests.post(
+            f"{BASE_URL}/leave/reject/{request_id}",
+            json={"rejected_reason": "併發測試拒絕"},
+            headers=headers
+        )
+    return request_id, response.status_code
+
+def test_concurrent_review():
+    """測試同時審核只會成功一次"""
+    print("🧪 開始測試併發審核...")
+    print("=" * 50)
+    
+    student_headers = login("student1@example.com")
+    reviewers = [login("teacher1@example.com"), login("admin1@example.com")]
+    reviewers = [headers for headers in reviewers if headers]
+    if not student_headers or not reviewers:
+        return
+    
+    request_ids = create_requests(student_headers)
+    print(f"✅ 建立 {len(request_ids)} 筆請假申請")
+    
+    # 所有審核請求同時送出
+    jobs = [
+        (request_id, reviewers[i % len(reviewers)], i)
+        for request_id in request_ids
+        for i in range(REVIEWS_PER_REQUEST)
+    ]
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        results = list(executor.map(lambda job: review(*job), jobs))
+    
+    failures = 0
+    for request_id in request_ids:
+        statuses = [status for rid, status in results if rid == request_id]
+        succeeded = statuses.count(200)
+        already_processed = statuses.count(400)
+        if succeeded != 1 or already_processed != REVIEWS_PER_REQUEST - 1:
+            failures += 1
+            print(f"❌ {request_id}: 成功 {succeeded} 次, 已處理 {already_processed} 次, 其他 {statuses}")
+    
+    print("=" * 50)
+    if failures == 0:
+        print(f"✅ 全部 {len(request_ids)} 筆申請都只被審核一次")
+    else:
+        print(f"❌ {failures} 筆申請的審核次數不正確")
+    assert failures == 0
+
+if __name__ == "__main__":
+    test_concurrent_review()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+測試反向代理後方的用戶端 IP 與限流
+docker-compose 中後端位於 nginx 之後（PROXY_FIX_X_FOR=1），確認：
+  - client_ip() 取得 X-Forwarded-For 中由 nginx 加入的用戶端 IP，而非 nginx 的 IP
+  - 用戶端自行偽造的 X-Forwarded-For 前段不會被採用
+  - 限流依各用戶端分別計算，一個用戶端被限流不影響其他用戶端
+
+不需要 MongoDB：
+
+    python test_proxy_rate_limit.py
+"""
+
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+os.environ['PROXY_FIX_X_FOR'] = '1'
+os.environ['ENSURE_INDEXES'] = 'false'
+os.environ.setdefault('JWT_SECRET_KEY', 'test-jwt-secret-key-for-proxy-rate-limit')
+
+from app import create_app  # noqa: E402
+from utils.rate_limit import client_ip, rate_limited  # noqa: E402
+
+NGINX_IP = '172.18.0.5'
+
+
+def create_test_app():
+    """加上兩個不查詢資料庫的端點：回傳 client_ip()，以及每個 IP 60 秒內限 2 次的端點"""
+    app = create_app()
+    rule = f'test-ip-{uuid.uuid4().hex[:8]}'
+
+    @app.route('/test/client-ip')
+    def show_client_ip():
+        return client_ip()
+
+    @app.route('/test/limited')
+    @rate_limited((rule, client_ip, '2/60'))
+    def limited():
+        return 'ok'
+
+    return app.test_client()
+
+
+def via_nginx(client, path, forwarded_for):
+    """模擬 nginx 轉發：連線來源為 nginx，X-Forwarded-For 最後一段為 nginx 看到的用戶端 IP"""
+    return client.get(path, headers={'X-Forwarded-For': forwarded_for},
+                      environ_base={'REMOTE_ADDR': NGINX_IP})
+
+
+def test_client_ip_behind_proxy():
+    client = create_test_app()
+    assert via_nginx(client, '/test/client-ip', '203.0.113.7').get_data(as_text=True) == '203.0.113.7'
+    # 用戶端偽造的前段被忽略，只信任 nginx 加入的最後一段
+    assert via_nginx(client, '/test/client-ip', '1.2.3.4, 203.0.113.7').get_data(as_text=True) == '203.0.113.7'
+
+
+def test_rate_limit_per_client():
+    client = create_test_app()
+    statuses = [via_nginx(client, '/test/limited', '203.0.113.7').status_code for _ in range(3)]
+    assert statuses == [200, 200, 429], statuses
+    # 另一個用戶端經同一台 nginx 轉發，不受影響
+    assert via_nginx(client, '/test/limited', '198.51.100.9').status_code == 200
+
+
+if __name__ == "__main__":
+    print("🧪 反向代理後方的用戶端 IP 與限流")
+    test_client_ip_behind_proxy()
+    print("✅ client_ip() 取得 nginx 轉發的用戶端 IP")
+    test_rate_limit_per_client()
+    print("✅ 限流依各用戶端分別計算")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+測試各 API 查詢的執行計畫
+先依 config/indexes.py 建立缺少的索引，再以 explain() 確認每一種查詢條件組合：
+  - 不會進行全集合掃描 (COLLSCAN)
+  - 有指定索引的查詢使用該索引；分頁清單不需在記憶體中排序 (SORT)
+
+使用前請先以 docker-compose 啟動 MongoDB，並執行 test_data_setup.py 建立測試資料：
+
+    MONGODB_URI=mongodb://localhost:27017/student_leave_system python test_query_plans.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+os.environ.setdefault('MONGODB_URI', 'mongodb://localhost:27017/student_leave_system')
+os.environ.setdefault('MONGODB_DATABASE', 'student_leave_system')
+
+from bson import ObjectId  # noqa: E402
+from config.database import db  # noqa: E402
+from config.indexes import ensure_indexes  # noqa: E402
+from models.leave_request import ACTIVE_STATUSES, EXPORT_SORT, LeaveRequest  # noqa: E402
+from models.leave_summary import term_of  # noqa: E402
+from utils.pagination import keyset_filter, keyset_sort  # noqa: E402
+
+PAGE_LIMIT = 51
+
+# 分頁清單使用的索引
+USER_LIST_INDEX = [('user_id', 1), ('created_at', -1), ('_id', -1)]
+PENDING_INDEX = [('status', 1), ('created_at', 1), ('_id', 1)]
+
+
+def query_shapes():
+    """API 會產生的查詢條件組合 (名稱, 集合, 查詢條件, 排序, 預期使用的索引)
+
+    預期索引為 None 時只檢查不會全集合掃描（由查詢最佳化工具依資料分布選擇索引）
+    """
+    now = datetime.utcnow()
+    user_id = ObjectId()
+    after = keyset_filter((now, ObjectId()), descending=True)
+    newest_first = keyset_sort(descending=True)
+
+    search = {
+        '關鍵字': (dict(text='感冒'), [('reason_ngrams', 1), ('created_at', -1), ('_id', -1)]),
+        '關鍵字 + 狀態': (dict(text='家裡有事', status='pending'), None),
+        '日期範圍': (dict(date_from=now, date_to=now + timedelta(days=7)), None),
+        '日期範圍 + 假別': (dict(date_from=now, date_to=now + timedelta(days=7), leave_type='sick'), None),
+        '假別': (dict(leave_type='sick'), [('leave_type', 1), ('created_at', -1), ('_id', -1)]),
+        '假別 + 狀態': (dict(leave_type='personal', status='approved'), None),
+        '狀態': (dict(status='rejected'), PENDING_INDEX),
+        '學號': (dict(user_ids=[user_id]), USER_LIST_INDEX),
+        '學號 + 關鍵字 + 日期範圍': (dict(user_ids=[user_id], text='看醫生', date_from=now), None),
+        '審核人': (dict(reviewer_id=str(user_id)), [('approved_by', 1), ('created_at', -1), ('_id', -1)]),
+        '審核人 + 狀態': (dict(reviewer_id=str(user_id), status='approved'), None),
+        '無條件': (dict(), [('created_at', -1), ('_id', -1)]),
+    }
+    for name, (kwargs, index) in search.items():
+        query = LeaveRequest.search_query(**kwargs)
+        yield f'搜尋: {name}', 'leave_requests', query, newest_first, index
+        yield f'搜尋: {name} (下一頁)', 'leave_requests', {**query, **after}, newest_first, index
+
+    yield '我的請假記錄', 'leave_requests', {'user_id': user_id}, newest_first, USER_LIST_INDEX
+    yield '我的請假記錄 (下一頁)', 'leave_requests', {'user_id': user_id, **after}, newest_first, USER_LIST_INDEX
+    yield '我的請假記錄 (狀態)', 'leave_requests', {'user_id': user_id, 'status': 'approved'}, newest_first, None
+    yield '待審核清單', 'leave_requests', {'status': 'pending'}, keyset_sort(), PENDING_INDEX
+    yield '待審核清單 (下一頁)', 'leave_requests', {'status': 'pending', **keyset_filter((now, ObjectId()))}, \
+        keyset_sort(), PENDING_INDEX
+
+    yield '申請日期重疊檢查', 'leave_requests', {
+        'user_id': user_id,
+        'end_date': {'$gte': now},
+        'start_date': {'$lte': now + timedelta(days=2)},
+        'status': {'$in': list(ACTIVE_STATUSES)}
+    }, None, [('user_id', 1), ('end_date', 1), ('start_date', 1)]
+    # 匯出使用與 LeaveRequest.iter_export 相同的排序；統計報表的 $match 與匯出的查詢條件相同
+    export_sort = EXPORT_SORT
+    export_index = [('start_date', 1), ('_id', 1)]
+    date_range = {'start_date': {'$gte': now - timedelta(days=30), '$lt': now}}
+    yield '匯出', 'leave_requests', date_range, export_sort, export_index
+    yield '匯出 + 狀態', 'leave_requests', {**date_range, 'status': 'approved'}, export_sort, export_index
+    yield '匯出 (全部)', 'leave_requests', {}, export_sort, export_index
+    yield '統計報表', 'leave_requests', date_range, None, export_index
+    yield '今日審核數', 'leave_requests', {'approved_at': {'$gte': now - timedelta(days=1)}}, None, \
+        [('approved_at', 1)]
+
+    yield '登入 / 註冊', 'users', {'email': 'student@example.com'}, None, [('email', 1)]
+    yield '依學號查找學生', 'users', {'student_id': 'S001'}, None, [('student_id', 1)]
+    yield '請假彙總', 'leave_summaries', {'user_id': user_id, 'term': term_of(now)}, None, \
+        [('user_id', 1), ('term', 1)]
+
+
+def find_stages(plan):
+    """遞迴取出執行計畫中的所有 stage (stage 名稱, 索引欄位)"""
+    stages = []
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append((plan['stage'], [tuple(item) for item in plan.get('keyPattern', {}).items()]))
+        for value in plan.values():
+            stages.extend(find_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(find_stages(item))
+    return stages
+
+
+def check_plan(stages, sort, index):
+    """回傳執行計畫的問題清單（空清單表示通過）"""
+    names = [name for name, _ in stages]
+    problems = []
+    if 'COLLSCAN' in names:
+        problems.append('全集合掃描')
+    if index is not None:
+        if not any(name == 'IXSCAN' and keys == index for name, keys in stages):
+            problems.append(f'未使用索引 {index}')
+        elif sort is not None and 'SORT' in names:
+            problems.append('需在記憶體中排序')
+    return problems
+
+
+def test_query_plans():
+    """所有查詢都使用預期的索引"""
+    print("🧪 開始檢查查詢執行計畫...")
+    print("=" * 50)
+
+    for collection_name, keys in ensure_indexes():
+        print(f"🔧 已建立缺少的索引: {collection_name} {keys}")
+
+    if db.get_collection('leave_requests').estimated_document_count() == 0:
+        print("⚠️ leave_requests 沒有資料，請先執行 test_data_setup.py")
+
+    failures = 0
+    for name, collection_name, query, sort, index in query_shapes():
+        cursor = db.get_collection(collection_name).find(query).limit(PAGE_LIMIT)
+        if sort:
+            cursor = cursor.sort(sort)
+        stages = find_stages(cursor.explain()['queryPlanner']['winningPlan'])
+        plan = ' <- '.join(name for name, _ in stages)
+        problems = check_plan(stages, sort, index)
+        if problems:
+            failures += 1
+            print(f"❌ {name}: {plan}（{'、'.join(problems)}）")
+        else:
+            print(f"✅ {name}: {plan}")
+
+    print("=" * 50)
+    if failures == 0:
+        print("✅ 所有查詢都使用預期的索引")
+    else:
+        print(f"❌ {failures} 個查詢的執行計畫不符預期")
+    assert failures == 0
+
+
+if __name__ == "__main__":
+    test_query_plans()